@@ -1,13 +1,17 @@
+# Imported first so that the startup profiler can time all other imports
+from launcher import profiler  # isort: skip
+
 import logging
 import os
 import pathlib
 import subprocess
 import sys
 import time
+from functools import partial
 from typing import Optional
 
 from PySide6 import QtCore
-from PySide6.QtCore import QTimer
+from PySide6.QtCore import SIGNAL, QTimer
 from PySide6.QtGui import QCursor, QIcon, Qt
 from PySide6.QtWidgets import (
     QApplication,
@@ -18,7 +22,23 @@ from PySide6.QtWidgets import (
     QWidget,
 )
 
-from launcher import credentials, settings, threads, ui, utils, version
+from launcher import (
+    autologin,
+    clock,
+    credentials,
+    handoff,
+    journal,
+    manifest,
+    mpq,
+    repair,
+    scheduler,
+    self_update,
+    settings,
+    threads,
+    ui,
+    utils,
+    version,
+)
 from launcher.config import Config
 
 basedir = pathlib.Path(os.path.dirname(__file__))
@@ -33,6 +53,11 @@ logging.basicConfig(
 
 logger = logging.getLogger("Duskhaven Launcher")
 
+profiler.mark("imports")
+
+OLD_LAUNCHER_REMOVAL_ATTEMPTS = 10
+OLD_LAUNCHER_REMOVAL_INTERVAL = 1000
+
 
 class Launcher(QMainWindow):
     def __init__(self):
@@ -45,17 +70,28 @@ class Launcher(QMainWindow):
         self.setWindowFlags(QtCore.Qt.FramelessWindowHint)
         self.setWindowIcon(QIcon(os.path.join(basedir, "images", "favicon.ico")))
 
-        self.configuration = settings.Settings("config.json")
+        self.configuration = settings.Settings(
+            "config.json", journal.Journal("download_state.journal")
+        )
+        profiler.mark("settings")
 
         if self.configuration.get("just_updated", False):
-            temp_file = pathlib.Path("temp_launcher")
-            if temp_file.exists():
-                temp_file.unlink()
             self.configuration["just_updated"] = False
             self.configuration.save()
+            self.remove_old_launcher()
+
+        # Runs all periodic work, paused while the window is hidden
+        self.scheduler = scheduler.Scheduler(self)
+        self.scheduler.watch(self)
+        # Shared once-a-second tick for every countdown
+        self.clock = clock.Clock(self.scheduler, self)
 
         # Get the global QThreadPool instance
         self.task = None
+        self.repair_task = None
+        # Archives found damaged before the last start, repaired by the next
+        # repair even if the file check misses them
+        self.damaged_archives = []
 
         self.main_layout = QGridLayout()
 
@@ -68,8 +104,16 @@ class Launcher(QMainWindow):
         self.progress_bar = ui.ProgressBar(self)
         self.progress_bar.hide()
 
-        if "installation_path" in self.configuration:
-            utils.add_outdated_files_to_queue(self.configuration)
+        # Update checks run off the GUI thread. Until their results arrive the
+        # start button shows a placeholder instead of PLAY or UPDATE.
+        self.started_at = time.time()
+        self.update_check_ttl = utils.get_update_check_ttl(self.configuration)
+        self.update_checks_revalidated = not self.update_check_ttl
+        self.checking_updates = not utils.check_first_time_user(
+            self.configuration
+        ) and not self.configuration.get("install_in_progress", False)
+        self.first_paint_logged = False
+        self.update_check_tasks = set()
 
         self.create_start_button()
 
@@ -93,10 +137,107 @@ class Launcher(QMainWindow):
         central_widget = QWidget()
         central_widget.setLayout(self.main_layout)
         self.setCentralWidget(central_widget)
+        profiler.mark("widgets")
+
+        self.check_for_updates(self.update_check_ttl)
+
+    def paintEvent(self, event):
+        super().paintEvent(event)
+        if not self.first_paint_logged:
+            self.first_paint_logged = True
+            logger.info(
+                "Time to first paint: "
+                f"{(time.perf_counter() - profiler.start_time) * 1000:.0f}ms"
+            )
+            profiler.mark("first paint")
+            profiler.report()
+            update_latency = handoff.notify_ready()
+            if update_latency is not None:
+                logger.info(f"Update-to-ready latency: {update_latency * 1000:.0f}ms")
+
+    def remove_old_launcher(self, attempts=OLD_LAUNCHER_REMOVAL_ATTEMPTS):
+        # The old launcher may still be running until this one reports ready
+        temp_file = handoff.get_launcher_path().parent / "temp_launcher"
+        try:
+            temp_file.unlink(missing_ok=True)
+        except OSError as e:
+            if attempts <= 1:
+                return logger.warning(f"Removing {temp_file} failed: {e}")
+            QTimer.singleShot(
+                OLD_LAUNCHER_REMOVAL_INTERVAL,
+                partial(self.remove_old_launcher, attempts - 1),
+            )
+
+    def check_for_updates(self, max_age):
+        """
+        Checks for outdated files and a new launcher release in a background
+        task. Results younger than max_age seconds are served from the cache.
+        """
+        check_files = "installation_path" in self.configuration and (
+            self.configuration.get("install_in_progress", False)
+            or not self.configuration.get("ignore_updates", False)
+        )
+        update_check_task = threads.UpdateCheckTask(
+            self.configuration, max_age, check_files
+        )
+        update_check_task.signals.outdated_files.connect(self.merge_outdated_files)
+        update_check_task.signals.latest_release.connect(self.merge_latest_release)
+        update_check_task.signals.finished.connect(
+            partial(self.finish_update_check, update_check_task)
+        )
+        # Checks may overlap, each one's signals must live until it finished
+        self.update_check_tasks.add(update_check_task)
+        QtCore.QThreadPool.globalInstance().start(update_check_task)
+
+    def check_installed_files(self):
+        # Outdated files are merged into the queue once the background check
+        # is done, reusing the network results of this launch
+        self.check_for_updates(time.time() - self.started_at)
+
+    def finish_update_check(self, update_check_task):
+        self.update_check_tasks.discard(update_check_task)
+        if self.checking_updates:
+            self.checking_updates = False
+            if self.task is None:
+                self.start_button.setEnabled(True)
+                self.create_start_button()
+                self.progress_bar.progress_bar_label.update_progress_label(
+                    "100%" if self.start_button.text() == "PLAY" else ""
+                )
+
+        # Results served from the cache are revalidated once, reusing
+        # everything that was fetched from the network during this launch
+        if not self.update_checks_revalidated:
+            self.update_checks_revalidated = True
+            self.check_for_updates(time.time() - self.started_at)
+
+    def merge_outdated_files(self, outdated_files):
+        download_queue = self.configuration.get("download_queue", [])
+        new_files = [file for file in outdated_files if file not in download_queue]
+        if not new_files:
+            return
+        logger.info(f"Found outdated files: {new_files}")
+        self.configuration["download_queue"] = download_queue + new_files
+        self.configuration.save()
+
+        # Only an idle PLAY button is switched, running tasks pick up the queue
+        if (
+            self.checking_updates
+            or self.task is not None
+            or self.start_button.text() != "PLAY"
+        ):
+            return
+        self.progress_bar.progress_bar_label.autoplay.stop_countdown()
+        self.start_button.clicked.disconnect()
+        self.start_button.clicked.connect(self.update_game)
+        self.set_start_button_text("UPDATE")
 
-        latest_version, latest_assets = utils.get_latest_release()
+    def merge_latest_release(self, latest_version, latest_assets):
+        if self.task is not None:
+            return
         if utils.compare_versions(latest_version, version.version) == 1:
             logger.info(f"New launcher version available: {latest_version}")
+            self.checking_updates = False
             self.update_launcher(latest_assets)
 
     def create_start_button(self):
@@ -104,24 +245,38 @@ class Launcher(QMainWindow):
             self.start_button = ui.Button(self, "", None)
             self.set_start_button_text("PLAY")
 
-        if utils.check_first_time_user(self.configuration):
+        if self.checking_updates:
+            logger.info("Setting interaction button to CHECKING FOR UPDATES")
+            self.set_start_button_text("CHECKING FOR UPDATES")
+            self.start_button.setEnabled(False)
+            self.progress_bar.progress_bar_label.update_progress_label(
+                "Checking for updates..."
+            )
+        elif utils.check_first_time_user(self.configuration):
             logger.info("Setting interaction button to INSTALL")
             self.set_start_button_text("INSTALL")
-            self.start_button.clicked.connect(self.start_install_game)
+            self.connect_start_button(self.start_install_game)
         elif self.configuration.get("install_in_progress", False):
             logger.info("Setting interaction button to RESUME INSTALL")
             self.set_start_button_text("RESUME INSTALL")
-            self.start_button.clicked.connect(self.download_client)
+            self.connect_start_button(self.download_client)
         elif self.configuration.get("download_queue"):
             logger.info("Setting interaction button to UPDATE")
             self.set_start_button_text("UPDATE")
-            self.start_button.clicked.connect(self.update_game)
+            self.connect_start_button(self.update_game)
         else:
             logger.info("Setting interaction button to PLAY")
             self.set_start_button_text("PLAY")
-            self.start_button.clicked.connect(self.start_game)
+            self.connect_start_button(self.start_game)
             self.progress_bar.progress_bar_label.autoplay.set_autoplay()
 
+    def connect_start_button(self, slot):
+        # Also called for a button that is already wired up, and a click must
+        # never run two slots, e.g. start the game twice
+        if self.start_button.receivers(SIGNAL("clicked(bool)")):
+            self.start_button.clicked.disconnect()
+        self.start_button.clicked.connect(slot)
+
     def start_install_game(self):
         logger.info("Start install game")
         if hasattr(self, "installation_dialog"):
@@ -159,7 +314,6 @@ class Launcher(QMainWindow):
         if "wow-client.zip" not in download_queue and not wow_zip_dest_path.exists():
             self.configuration["download_queue"] = ["wow-client.zip"] + download_queue
             self.configuration.save()
-        utils.add_outdated_files_to_queue(self.configuration)
 
         if wow_zip_dest_path.exists():
             self.start_install_task(wow_zip_dest_path)
@@ -168,6 +322,8 @@ class Launcher(QMainWindow):
             self.set_start_button_text("PAUSE")
             self.start_button.clicked.disconnect()
             self.start_button.clicked.connect(self.pause_install_game)
+        # Queues the custom files while the client is downloaded and installed
+        self.check_installed_files()
 
     def download_client(self):
         logger.info("Download client")
@@ -180,7 +336,7 @@ class Launcher(QMainWindow):
             )
             if len(self.configuration["download_queue"]) > 0:
                 file = self.configuration["download_queue"][0]
-                url = Config.LINKS[file]
+                url = utils.get_download_url(self.configuration, file)
                 self.create_runnable(
                     url=url,
                     dest_path=pathlib.Path(self.configuration["installation_path"])
@@ -200,7 +356,7 @@ class Launcher(QMainWindow):
         logger.info("Updating game.")
         if not self.task:
             file = self.configuration["download_queue"][0]
-            url = Config.LINKS[file]
+            url = utils.get_download_url(self.configuration, file)
             self.create_runnable(
                 url=url,
                 dest_path=pathlib.Path(self.configuration["installation_path"]) / file,
@@ -223,19 +379,17 @@ class Launcher(QMainWindow):
         )
         self.task.signals.finished_download.connect(self.download_next_or_stop)
         self.task.signals.finished_launcher_download.connect(
-            self.complete_launcher_update
+            self.prepare_launcher_update
         )
         self.task.signals.failed_download.connect(self.restart_download_task)
         self.task.signals.update_config.connect(self.update_config)
 
     def start_install_task(self, dest_path):
         self.number_install_dots = 1
-        self.install_label_timer = QTimer()
         self.start_button.setEnabled(False)
         self.set_start_button_text("EXCTRACTING CLIENT")
         self.start_button.clicked.disconnect()
-        self.install_label_timer.timeout.connect(self.set_installing_label)
-        self.install_label_timer.start(1000)
+        self.scheduler.add("install label", self.set_installing_label, 1)
         self.install_task = threads.InstallWoWTask(
             pathlib.Path(self.configuration["installation_path"]),
             pathlib.Path(dest_path),
@@ -266,11 +420,13 @@ class Launcher(QMainWindow):
     ):
         # Download the next file in the queue or stop the download
         if dest_path and etag:
-            file_versions = self.configuration.get("file_versions", {})
+            file_versions = dict(self.configuration.get("file_versions", {}))
             file_versions[pathlib.Path(dest_path).name] = etag
             self.configuration["file_versions"] = file_versions
             self.configuration["paused_download_etag"] = None
-            removed_download = self.configuration["download_queue"].pop(0)
+            download_queue = list(self.configuration["download_queue"])
+            removed_download = download_queue.pop(0)
+            self.configuration["download_queue"] = download_queue
             logger.info(
                 "download_next_or_stop: Removing "
                 f"{removed_download} from download queue."
@@ -294,7 +450,7 @@ class Launcher(QMainWindow):
         if download_queue:
             file = download_queue[0]
             self.create_runnable(
-                url=Config.LINKS[file],
+                url=utils.get_download_url(self.configuration, file),
                 dest_path=pathlib.Path(self.configuration["installation_path"]) / file,
                 paused_download_etag=self.configuration.get("paused_download_etag"),
             )
@@ -321,13 +477,12 @@ class Launcher(QMainWindow):
             self.install_task.wait()
             self.install_task = None
 
-        if hasattr(self, "install_label_timer"):
-            self.install_label_timer.stop()
+        self.scheduler.remove("install label")
 
-        download_queue = self.configuration.get("download_queue", [])
+        download_queue = list(self.configuration.get("download_queue", []))
         if len(download_queue) > 0 and download_queue[0] == "wow-client.zip":
+            removed_download = download_queue.pop(0)
             self.configuration["download_queue"] = download_queue
-            removed_download = self.configuration["download_queue"].pop(0)
             logger.info(f"Removing {removed_download} from download queue.")
             logger.info(f"Download queue: {self.configuration['download_queue']}")
             self.configuration.save()
@@ -339,45 +494,121 @@ class Launcher(QMainWindow):
             return
 
         self.start_button.setEnabled(True)
-        self.start_button.clicked.connect(self.update_game)
-        self.update_game()
-
-    def complete_launcher_update(self, new_version_path):
-        if getattr(sys, "frozen", False):
-            # The application is frozen.
-            executable_path = pathlib.Path(sys.executable)
+        self.connect_start_button(self.update_game)
+        if self.configuration.get("download_queue"):
+            self.update_game()
         else:
-            # The application is not frozen.
-            # We assume the script is being executed from the command line.
-            executable_path = pathlib.Path(sys.argv[0])
+            self.download_next_or_stop(None, None)
+        # The client files from the zip may be older than the manifest
+        self.check_installed_files()
 
+    def complete_launcher_update(self, new_version_path):
+        executable_path = handoff.get_launcher_path()
         logger.info(f"Name of current launcher: {executable_path}")
 
-        new_version_path = pathlib.Path(new_version_path)
+        self.new_version_path = pathlib.Path(new_version_path)
+        self.old_version_path = executable_path.parent / "temp_launcher"
 
-        temp_name = "temp_launcher"
+        # Windows allows renaming a running executable but not deleting it, so
+        # the new launcher removes the old one once this process has exited
+        self.old_version_moved = False
         try:
-            executable_path.rename(executable_path.parent / temp_name)
-            time.sleep(1)
-        except Exception as e:
-            logger.error(e)
-        try:
-            new_version_path.rename(executable_path)
-            time.sleep(1)
-        except Exception as e:
-            logger.error(e)
-
+            # Left over if removing it after an earlier update failed
+            self.old_version_path.unlink(missing_ok=True)
+            executable_path.rename(self.old_version_path)
+            self.old_version_moved = True
+            self.new_version_path.rename(executable_path)
+        except OSError as e:
+            logger.error(f"Swapping the launcher failed: {e}")
+            return self.restore_launcher(executable_path)
+
+        # The new launcher reads the configuration and credentials as soon as
+        # it starts
         self.configuration["just_updated"] = True
-        self.configuration.save()
+        self.configuration.flush()
+        credentials.store.flush()
 
-        time.sleep(2)
         logger.info(f"Starting Launcher: {executable_path}")
+        self.hide()
         try:
-            subprocess.Popen(str(executable_path), shell=True).wait()
-        except Exception as e:
-            logger.error(e)
+            self.handoff = handoff.Handoff()
+            self.handoff.start(handoff.launcher_command(executable_path))
+        except OSError as e:
+            logger.error(f"Starting the new launcher failed: {e}")
+            return self.restore_launcher(executable_path)
+
+        self.handoff_task = threads.HandoffTask(self.handoff)
+        self.handoff_task.signals.handoff_finished.connect(
+            partial(self.finish_handoff, executable_path)
+        )
+        self.handoff_task.start()
 
-        QApplication.quit()
+    def finish_handoff(self, executable_path, ready):
+        if ready:
+            logger.info("New launcher is ready, exiting")
+            return QApplication.quit()
+        self.restore_launcher(executable_path)
+
+    def restore_launcher(self, executable_path):
+        # Puts the running launcher back in place after a failed update. Only
+        # if it was moved, a temp_launcher from elsewhere would be a downgrade
+        if self.old_version_moved:
+            try:
+                if executable_path.exists():
+                    executable_path.rename(self.new_version_path)
+                self.old_version_path.rename(executable_path)
+            except OSError as e:
+                logger.error(f"Restoring the launcher failed: {e}")
+        self.configuration["just_updated"] = False
+        self.configuration.save()
+
+        self.show()
+        self.task = None
+        self.progress_bar.progress_bar_label.update_progress_label(
+            "Updating the launcher failed. Please try again later."
+        )
+        self.start_button.setEnabled(True)
+        self.create_start_button()
+
+    def start_repair(self):
+        if self.task or self.repair_task:
+            logger.warning("Cannot repair while another task is running.")
+            return
+        logger.info("Start repairing game")
+        self.progress_bar.progress_bar_label.autoplay.stop_countdown()
+        self.start_button.setEnabled(False)
+        self.set_start_button_text("REPAIRING")
+        self.repair_task = threads.RepairTask(
+            pathlib.Path(self.configuration["installation_path"]),
+            self.load_repair_manifest(),
+            self.damaged_archives,
+        )
+        self.damaged_archives = []
+        self.repair_task.signals.progress_update.connect(
+            self.progress_bar.update_progress
+        )
+        self.repair_task.signals.progress_label_update.connect(
+            self.progress_bar.progress_bar_label.update_progress_label
+        )
+        self.repair_task.signals.repair_finished.connect(self.finish_repair)
+        self.repair_task.start()
+
+    def load_repair_manifest(self):
+        if not self.configuration.get("manifest_url", Config.MANIFEST_URL):
+            return None
+        return manifest.load_cached_manifest()[0]
+
+    def finish_repair(self, successful, number_of_files):
+        self.repair_task.wait()
+        self.repair_task = None
+        self.check_wow_install()
+        if not successful:
+            message = "Repair failed! See launcher.log for details."
+        elif number_of_files == 0:
+            message = "No damaged files found."
+        else:
+            message = f"Repaired {number_of_files} files."
+        self.progress_bar.progress_bar_label.update_progress_label(message)
 
     def pause_install_game(self):
         logger.info("Pause install game")
@@ -385,6 +616,7 @@ class Launcher(QMainWindow):
         self.start_button.clicked.disconnect()
         self.start_button.clicked.connect(self.resume_install_game)
         self.task.pause()
+        self.configuration.flush()
 
     def resume_install_game(self):
         logger.info("Resume install game")
@@ -398,14 +630,13 @@ class Launcher(QMainWindow):
         if utils.check_wow_install(
             pathlib.Path(self.configuration["installation_path"])
         ):
-            utils.add_outdated_files_to_queue(self.configuration)
             if hasattr(self, "installation_dialog"):
                 self.installation_dialog.deleteLater()
                 self.main_layout.addWidget(self.progress_bar, 4, 0, 1, 2)
                 self.main_layout.addWidget(self.start_button, 4, 2, 1, 1)
                 self.progress_bar.show()
             # If any file needs update -> update
-            if len(self.configuration["download_queue"]) > 0:
+            if len(self.configuration.get("download_queue", [])) > 0:
                 self.start_button.clicked.disconnect()
                 self.start_button.clicked.connect(self.update_game)
                 self.set_start_button_text("UPDATE")
@@ -416,6 +647,7 @@ class Launcher(QMainWindow):
                 self.start_button.clicked.connect(self.start_game)
                 self.set_start_button_text("PLAY")
                 status = "PLAY"
+            self.check_installed_files()
         else:
             status = "INSTALL"
 
@@ -438,13 +670,9 @@ class Launcher(QMainWindow):
         self.start_button.setEnabled(False)
         self.progress_bar.progress_bar_label.autoplay.autoplay.setCheckable(False)
         self.progress_bar.progress_bar_label.autoplay.autoplay.setChecked(False)
-        if hasattr(self.progress_bar.progress_bar_label.autoplay, "autoplay_timer"):
-            self.progress_bar.progress_bar_label.autoplay.autoplay_timer.stop()
+        self.progress_bar.progress_bar_label.autoplay.stop_countdown()
 
-        if getattr(sys, "frozen", False):
-            executable_path = pathlib.Path(sys.executable)
-        else:
-            executable_path = pathlib.Path(sys.argv[0])
+        executable_path = handoff.get_launcher_path()
 
         possible_assets = [
             asset for asset in assets if asset["name"].endswith(executable_path.suffix)
@@ -455,11 +683,32 @@ class Launcher(QMainWindow):
             logger.warning("Found multiple assets")
 
         asset = possible_assets[0]
+        self.launcher_asset = asset
+        self.launcher_assets = assets
+
+        patch_asset = self_update.find_patch_asset(assets, asset, version.version)
+        if patch_asset is None:
+            return self.download_launcher(asset)
 
+        logger.info(
+            f"Start downloading {patch_asset['name']} "
+            f"from {patch_asset['browser_download_url']}"
+        )
+        self.launcher_patch_path = pathlib.Path(patch_asset["name"])
+        self.create_runnable(
+            url=patch_asset["browser_download_url"],
+            dest_path=self.launcher_patch_path,
+            paused_download_etag=None,
+        )
+        self.task.total_size = patch_asset["size"]
+        self.task.start()
+
+    def download_launcher(self, asset):
         logger.info(
             f"Start downloading {asset['name']} "
             f"from {asset['browser_download_url']}"
         )
+        self.launcher_patch_path = None
 
         file = asset["name"] + ".new"
         self.create_runnable(
@@ -468,8 +717,61 @@ class Launcher(QMainWindow):
         self.task.total_size = asset["size"]
         self.task.start()
 
+    def prepare_launcher_update(self, download_path):
+        # Patches are applied to the running launcher, and both patched and
+        # downloaded binaries are checked against the published digest
+        executable_path = None
+        if self.launcher_patch_path is not None:
+            executable_path = handoff.get_launcher_path()
+            self.progress_bar.progress_bar_label.update_progress_label(
+                "Applying launcher patch..."
+            )
+        self.launcher_update_task = threads.LauncherUpdateTask(
+            download_path, self.launcher_asset, self.launcher_assets, executable_path
+        )
+        self.launcher_update_task.signals.update_prepared.connect(
+            self.finish_launcher_update
+        )
+        self.launcher_update_task.start()
+
+    def finish_launcher_update(self, successful, new_version_path):
+        if successful:
+            return self.complete_launcher_update(new_version_path)
+        if self.launcher_patch_path is not None:
+            logger.warning("Falling back to the full launcher download")
+            return self.download_launcher(self.launcher_asset)
+
+        self.task = None
+        self.progress_bar.progress_bar_label.update_progress_label(
+            "The launcher update is damaged. Please try again later."
+        )
+        self.start_button.setEnabled(True)
+        self.create_start_button()
+
     def start_game(self):
         logger.info("Starting game")
+        install_folder = pathlib.Path(self.configuration["installation_path"])
+        restorable_files = repair.restorable_files(
+            install_folder, self.load_repair_manifest()
+        )
+        self.damaged_archives = []
+        for path in mpq.check_archives(install_folder / "Data"):
+            file = path.relative_to(install_folder).as_posix()
+            if file.lower() in restorable_files:
+                self.damaged_archives.append(restorable_files[file.lower()])
+            else:
+                # Added by the user, so repairing could not restore it
+                logger.warning(f"Starting with damaged unmanaged archive {file}")
+        if self.damaged_archives:
+            self.progress_bar.progress_bar_label.update_progress_label(
+                f"Found {len(self.damaged_archives)} damaged game archives. "
+                "Please repair the client."
+            )
+            self.start_button.clicked.disconnect()
+            self.start_button.clicked.connect(self.start_repair)
+            self.set_start_button_text("REPAIR")
+            return
+
         password_ = None
         if self.configuration.get("save_credentials", False):
             password_ = credentials.get_password()
@@ -480,10 +782,11 @@ class Launcher(QMainWindow):
                 credentials.get_account_name(),
             )
 
+        self.scheduler.suspend("game")
+        install_folder = pathlib.Path(self.configuration["installation_path"])
+        started_at = time.time()
         if sys.platform.startswith("win"):
-            subprocess.Popen(
-                [pathlib.Path(self.configuration["installation_path"]) / "wow.exe"]
-            )
+            process = subprocess.Popen([install_folder / "wow.exe"])
         elif sys.platform.startswith("linux"):
             # if you prefer, these logging lines can be removed
             logger.info("Linux support is in beta")
@@ -492,33 +795,31 @@ class Launcher(QMainWindow):
                 "Proper prior setup of wine and related environment variables "
                 "is highly recommended"
             )
-            subprocess.Popen(
-                [
-                    "wine",
-                    pathlib.Path(self.configuration["installation_path"]) / "wow.exe",
-                ]
-            )
+            process = subprocess.Popen(["wine", install_folder / "wow.exe"])
         else:
             logger.error(f"{sys.platform} is completely unsupported!")
             logger.info("Exiting!")
+            return QApplication.quit()
 
         if password_ is None:
             return QApplication.quit()
 
-        if sys.platform.startswith("linux") or sys.platform.startswith("win"):
-            password_wait_timer = self.configuration.get("password_wait_timer")
-            if password_wait_timer is None:
-                self.configuration.set("password_wait_timer", 5)
-                self.configuration.save()
-            logger.info(
-                "Waiting "
-                + str(self.configuration.get("password_wait_timer"))
-                + " seconds before trying to enter password"
-            )
-            time.sleep(self.configuration["password_wait_timer"])
-            credentials.type_password(password_)
-            # credentials.type_key(Key.enter)
+        # The launcher stays alive off screen until the password is entered
+        self.hide()
+        self.autologin_task = threads.AutoLoginTask(
+            process,
+            install_folder,
+            password_,
+            started_at,
+            self.configuration.get("autologin_timeout", autologin.READY_TIMEOUT),
+        )
+        self.autologin_task.signals.login_finished.connect(self.finish_autologin)
+        self.autologin_task.start()
 
+    def finish_autologin(self, logged_in, elapsed):
+        if not logged_in:
+            logger.warning(f"Gave up entering the password after {elapsed:.1f}s")
+        self.autologin_task.wait()
         QApplication.quit()
 
     def mousePressEvent(self, event):
@@ -581,6 +882,13 @@ class Launcher(QMainWindow):
 
 
 if __name__ == "__main__":
+    if profiler.COMMAND_LINE_FLAG in sys.argv:
+        sys.argv.remove(profiler.COMMAND_LINE_FLAG)
+    if len(sys.argv) > 1:
+        from launcher import cli
+
+        sys.exit(cli.main(sys.argv[1:]))
+
     app = QApplication(sys.argv)
     launcher = Launcher()
     launcher.show()
@@ -1,3 +1,10 @@
 __all__ = ["ui"]
 
-from launcher import ui
+
+def __getattr__(name):
+    # The widgets pull in PySide6, so they are only imported when used
+    if name == "ui":
+        import importlib
+
+        return importlib.import_module("launcher.ui")
+    raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
@@ -0,0 +1,103 @@
+import logging
+import pathlib
+import sys
+import time
+
+logging.basicConfig(
+    filename="launcher.log",
+    filemode="a",
+    format="%(asctime)s,%(msecs)d %(name)s %(levelname)s %(message)s",
+    datefmt="%H:%M:%S",
+    level=logging.INFO,
+)
+
+logger = logging.getLogger("Auto Login")
+
+# Seconds to wait for the login screen before giving up on typing the password
+READY_TIMEOUT = 60
+POLL_INTERVAL = 0.1
+# Written by the client once the login screen's interface has been loaded
+GLUE_LOG = pathlib.Path("Logs") / "GlueXML.log"
+# Seconds after which a client that has not written GLUE_LOG is assumed not
+# to write it at all
+GLUE_LOG_GRACE_TIME = 20
+# Seconds the game window has to be in the foreground before typing, when
+# the client does not write GLUE_LOG
+WINDOW_SETTLE_TIME = 2
+
+
+def glue_log_written(install_folder, since):
+    try:
+        return (install_folder / GLUE_LOG).stat().st_mtime >= since
+    except OSError:
+        return False
+
+
+def game_window_in_foreground(process):
+    """
+    Returns:
+    bool: Whether the foreground window belongs to process. None where this
+    cannot be determined, e.g. for a client running in Wine.
+    """
+    if not sys.platform.startswith("win"):
+        return None
+    import ctypes
+    from ctypes import wintypes
+
+    user32 = ctypes.windll.user32
+    window = user32.GetForegroundWindow()
+    if not window:
+        return False
+    process_id = wintypes.DWORD()
+    user32.GetWindowThreadProcessId(window, ctypes.byref(process_id))
+    return process_id.value == process.pid
+
+
+def wait_until_ready(process, install_folder, started_at, timeout=READY_TIMEOUT):
+    """
+    Waits until the login screen of a just started client accepts input.
+
+    The client is ready once it wrote GLUE_LOG after started_at. Only if it
+    has not done so GLUE_LOG_GRACE_TIME seconds after the start, it is ready
+    once its window stayed in the foreground for WINDOW_SETTLE_TIME seconds,
+    or right away where the foreground window is unknown, e.g. in Wine.
+    On Windows, typing always waits for the game window to be in the
+    foreground, so keys never go elsewhere.
+
+    Args:
+    process (subprocess.Popen): The client process.
+    install_folder (pathlib.Path): The installation folder of the client.
+    started_at (float): time.time() when the client was started.
+    timeout (float): Seconds after which to give up.
+
+    Returns:
+    bool: True if ready, False if the client exited or timed out.
+    """
+    deadline = time.monotonic() + timeout
+    # started_at is wall clock time, the grace period is measured like it
+    grace_ends = started_at + GLUE_LOG_GRACE_TIME
+    in_foreground_since = None
+    while time.monotonic() < deadline:
+        if process.poll() is not None:
+            logger.warning(f"Game exited with code {process.returncode}")
+            return False
+        in_foreground = game_window_in_foreground(process)
+        if in_foreground:
+            in_foreground_since = in_foreground_since or time.monotonic()
+        else:
+            in_foreground_since = None
+
+        if in_foreground is not False and glue_log_written(install_folder, started_at):
+            return True
+        if time.time() >= grace_ends:
+            if in_foreground is None:
+                logger.info(f"No {GLUE_LOG} written, assuming the client is ready")
+                return True
+            if (
+                in_foreground_since is not None
+                and time.monotonic() - in_foreground_since >= WINDOW_SETTLE_TIME
+            ):
+                return True
+        time.sleep(POLL_INTERVAL)
+    logger.warning(f"Login screen did not appear within {timeout} seconds")
+    return False
@@ -0,0 +1,175 @@
+import bz2
+import functools
+import mmap
+import os
+import pathlib
+
+MAGIC = b"BSDIFF40"
+HEADER_SIZE = 32
+CHUNK_SIZE = 1024 * 1024
+
+
+class PatchError(ValueError):
+    pass
+
+
+def read_offset(data):
+    # bsdiff stores signed 64-bit integers as sign and magnitude
+    value = int.from_bytes(data, "little")
+    if value & (1 << 63):
+        return -(value & ((1 << 63) - 1))
+    return value
+
+
+@functools.lru_cache(maxsize=16)
+def _byte_masks(size):
+    return (
+        int.from_bytes(b"\x7f" * size, "little"),
+        int.from_bytes(b"\x80" * size, "little"),
+    )
+
+
+def add_bytes(diff, old):
+    """
+    Adds two equally long byte strings bytewise modulo 256.
+
+    Both are treated as one big integer each. Adding only the low seven bits of
+    every byte cannot carry into the next byte, and the top bits are combined
+    with an xor afterwards.
+    """
+    size = len(diff)
+    low, high = _byte_masks(size)
+    a = int.from_bytes(diff, "little")
+    b = int.from_bytes(old, "little")
+    return (((a & low) + (b & low)) ^ ((a ^ b) & high)).to_bytes(size, "little")
+
+
+class _Bz2Block:
+    """Reads exactly the requested number of bytes from one bz2 block."""
+
+    def __init__(self, path, start, length):
+        self.file = open(path, "rb")
+        self.file.seek(start)
+        self.remaining = length
+        self.decompressor = bz2.BZ2Decompressor()
+        self.buffer = bytearray()
+
+    def close(self):
+        self.file.close()
+
+    def read(self, size):
+        while len(self.buffer) < size:
+            if self.decompressor.eof:
+                raise PatchError("Patch block ended prematurely")
+            data = b""
+            if self.decompressor.needs_input:
+                data = self.file.read(min(CHUNK_SIZE, self.remaining))
+                if not data:
+                    raise PatchError("Patch file is truncated")
+                self.remaining -= len(data)
+            try:
+                self.buffer += self.decompressor.decompress(data, CHUNK_SIZE)
+            except OSError as e:
+                raise PatchError(f"Corrupt patch block: {e}") from e
+        result = bytes(self.buffer[:size])
+        del self.buffer[:size]
+        return result
+
+
+def _old_slice(old, position, size):
+    # Bytes outside of the old file count as zero
+    start = max(position, 0)
+    end = min(position + size, len(old))
+    if start >= end:
+        return bytes(size)
+    data = old[start:end]
+    return bytes(start - position) + data + bytes(position + size - end)
+
+
+def apply_patch(old_path, patch_path, new_path):
+    """
+    Applies a BSDIFF40 patch to old_path and writes the result to new_path.
+
+    The control, diff and extra blocks are decompressed as streams and the new
+    file is written in chunks, so memory use does not depend on the file
+    size. The old file is memory-mapped.
+
+    Raises:
+    PatchError: If the patch is malformed or does not fit the old file.
+    """
+    patch_path = pathlib.Path(patch_path)
+    patch_size = patch_path.stat().st_size
+    with open(patch_path, "rb") as f:
+        header = f.read(HEADER_SIZE)
+    if len(header) < HEADER_SIZE or header[:8] != MAGIC:
+        raise PatchError(f"{patch_path.name} is not a BSDIFF40 patch")
+    control_length = read_offset(header[8:16])
+    diff_length = read_offset(header[16:24])
+    new_size = read_offset(header[24:32])
+    if (
+        control_length < 0
+        or diff_length < 0
+        or new_size < 0
+        or HEADER_SIZE + control_length + diff_length > patch_size
+    ):
+        raise PatchError(f"{patch_path.name} has a corrupt header")
+
+    diff_start = HEADER_SIZE + control_length
+    extra_start = diff_start + diff_length
+    blocks = [
+        _Bz2Block(patch_path, HEADER_SIZE, control_length),
+        _Bz2Block(patch_path, diff_start, diff_length),
+        _Bz2Block(patch_path, extra_start, patch_size - extra_start),
+    ]
+    control, diff, extra = blocks
+
+    new_path = pathlib.Path(new_path)
+    temp_new_path = pathlib.Path(f"{new_path}.part")
+    try:
+        with open(old_path, "rb") as old_file, open(temp_new_path, "wb") as new_file:
+            old_size = os.fstat(old_file.fileno()).st_size
+            old = (
+                mmap.mmap(old_file.fileno(), 0, access=mmap.ACCESS_READ)
+                if old_size
+                else b""
+            )
+            try:
+                old_position = 0
+                new_position = 0
+                while new_position < new_size:
+                    entry = control.read(24)
+                    add_length = read_offset(entry[:8])
+                    copy_length = read_offset(entry[8:16])
+                    seek = read_offset(entry[16:24])
+                    if (
+                        add_length < 0
+                        or copy_length < 0
+                        or new_position + add_length + copy_length > new_size
+                    ):
+                        raise PatchError("Corrupt patch control block")
+
+                    for offset in range(0, add_length, CHUNK_SIZE):
+                        size = min(CHUNK_SIZE, add_length - offset)
+                        new_file.write(
+                            add_bytes(
+                                diff.read(size),
+                                _old_slice(old, old_position + offset, size),
+                            )
+                        )
+                    for offset in range(0, copy_length, CHUNK_SIZE):
+                        new_file.write(
+                            extra.read(min(CHUNK_SIZE, copy_length - offset))
+                        )
+
+                    new_position += add_length + copy_length
+                    old_position += add_length + seek
+            finally:
+                if old_size:
+                    old.close()
+        os.replace(temp_new_path, new_path)
+    except BaseException:
+        temp_new_path.unlink(missing_ok=True)
+        raise
+    finally:
+        for block in blocks:
+            block.close()
@@ -0,0 +1,61 @@
+import json
+import os
+import pathlib
+import threading
+import time
+
+
+class JsonCache:
+    """
+    Small persistent key/value store that remembers when each value was set.
+
+    Values have to be JSON serializable. Every write is flushed to disk
+    atomically, so the cache is meant for a handful of small entries like the
+    results of remote checks.
+    """
+
+    def __init__(self, filename):
+        self.filename = pathlib.Path(filename)
+        self.lock = threading.Lock()
+        self.load()
+
+    def load(self):
+        try:
+            with self.filename.open() as f:
+                self.entries = json.load(f)
+        except (FileNotFoundError, json.decoder.JSONDecodeError):
+            self.entries = {}
+
+    def save(self):
+        temp_filename = self.filename.with_name(f"{self.filename.name}.tmp")
+        with temp_filename.open("w") as f:
+            json.dump(self.entries, f)
+        os.replace(temp_filename, self.filename)
+
+    def get(self, key, ttl=None, default=None):
+        """
+        Returns the cached value of key, or default if there is none or it is
+        older than ttl seconds. A ttl of None accepts values of any age.
+        """
+        entry = self.entries.get(key)
+        if entry is None:
+            return default
+        if ttl is not None and time.time() - entry["timestamp"] > ttl:
+            return default
+        return entry["value"]
+
+    def set(self, key, value):
+        with self.lock:
+            self.entries[key] = {"value": value, "timestamp": time.time()}
+            self.save()
+
+    def pop(self, key, default=None):
+        with self.lock:
+            entry = self.entries.pop(key, None)
+            if entry is not None:
+                self.save()
+        return default if entry is None else entry["value"]
+
+
+# Results of remote checks (HEAD requests, GitHub API responses, update manifest)
+network_cache = JsonCache("network_cache.json")
@@ -0,0 +1,188 @@
+import argparse
+import json
+import logging
+import pathlib
+import time
+
+from launcher import manifest, remote_zip, repair, settings, verify
+
+logging.basicConfig(
+    filename="launcher.log",
+    filemode="a",
+    format="%(asctime)s,%(msecs)d %(name)s %(levelname)s %(message)s",
+    datefmt="%H:%M:%S",
+    level=logging.INFO,
+)
+
+logger = logging.getLogger("CLI")
+
+
+def get_install_folder(args):
+    if args.install_folder:
+        return pathlib.Path(args.install_folder)
+    configuration = settings.Settings("config.json")
+    if not configuration.get("installation_path"):
+        raise SystemExit("No installation path configured, use --install-folder.")
+    return pathlib.Path(configuration["installation_path"])
+
+
+def run_verify(args):
+    install_folder = get_install_folder(args)
+    zip_path = install_folder / "wow-client.zip"
+    if args.manifest:
+        manifest = verify.load_manifest(args.manifest)
+    elif zip_path.exists():
+        manifest = verify.client_zip_manifest(zip_path)
+    else:
+        raise SystemExit(f"No manifest given and {zip_path} does not exist.")
+
+    start_time = time.perf_counter()
+    damaged = verify.verify_install(
+        install_folder, manifest, verify.HashIndex(), args.workers
+    )
+    elapsed = time.perf_counter() - start_time
+    for file, reason in sorted(damaged.items()):
+        print(f"{reason:>8}  {file}")
+    print(
+        f"Verified {len(manifest['files'])} files in {elapsed * 1000:.1f}ms, "
+        f"{len(damaged)} damaged."
+    )
+
+    if damaged and args.extract:
+        if not zip_path.exists():
+            raise SystemExit(f"Cannot re-extract files, {zip_path} does not exist.")
+        verify.extract_client_files(install_folder, zip_path, list(damaged))
+        print(f"Re-extracted {len(damaged)} files from {zip_path}.")
+        return 0
+    return 1 if damaged else 0
+
+
+def run_repair(args):
+    install_folder = get_install_folder(args)
+    manifest = verify.load_manifest(args.manifest) if args.manifest else None
+
+    def print_progress(done, total, message):
+        print(f"[{done}/{total}] {message}")
+
+    start_time = time.perf_counter()
+    results = repair.repair_install(install_folder, manifest, print_progress)
+    elapsed = time.perf_counter() - start_time
+    failed = [file for file, repaired in results.items() if not repaired]
+    for file in failed:
+        print(f"  failed  {file}")
+    print(
+        f"Repaired {len(results) - len(failed)} of {len(results)} damaged files "
+        f"in {elapsed:.1f}s."
+    )
+    return 1 if failed else 0
+
+
+def run_fetch(args):
+    install_folder = get_install_folder(args)
+
+    def print_progress(done, total, message):
+        print(f"[{done}/{total}] {message}")
+
+    start_time = time.perf_counter()
+    files = remote_zip.extract_client_files(
+        install_folder, files=args.files or None, progress=print_progress
+    )
+    print(f"Fetched {len(files)} files in {time.perf_counter() - start_time:.1f}s.")
+    return 0
+
+
+def run_manifest(args):
+    start_time = time.perf_counter()
+    built_manifest = manifest.build_manifest(
+        args.folder, args.base_url, args.block_size, max_workers=args.workers
+    )
+    with open(args.output, "w") as f:
+        json.dump(built_manifest, f, indent=2)
+    print(
+        f"Wrote {len(built_manifest['files'])} files to {args.output} in "
+        f"{time.perf_counter() - start_time:.1f}s."
+    )
+    return 0
+
+
+def create_parser():
+    parser = argparse.ArgumentParser(prog="duskhaven_launcher")
+    parser.add_argument(
+        "--install-folder",
+        help="WoW installation folder. Defaults to the one in config.json.",
+    )
+    subparsers = parser.add_subparsers(dest="command", required=True)
+
+    verify_parser = subparsers.add_parser(
+        "verify", help="Hash the client files and compare them to a manifest."
+    )
+    verify_parser.add_argument(
+        "manifest",
+        nargs="?",
+        help="Path to the manifest JSON file. Defaults to the CRC32 checksums "
+        "stored in the local wow-client.zip.",
+    )
+    verify_parser.add_argument(
+        "--extract",
+        action="store_true",
+        help="Re-extract damaged files from the local wow-client.zip.",
+    )
+    verify_parser.add_argument(
+        "--workers", type=int, default=None, help="Number of hashing threads."
+    )
+    verify_parser.set_defaults(func=run_verify)
+
+    repair_parser = subparsers.add_parser(
+        "repair", help="Find damaged client files and fetch only those."
+    )
+    repair_parser.add_argument(
+        "manifest",
+        nargs="?",
+        help="Path to the manifest JSON file. Defaults to the CRC32 checksums "
+        "stored in the local wow-client.zip.",
+    )
+    repair_parser.set_defaults(func=run_repair)
+
+    fetch_parser = subparsers.add_parser(
+        "fetch",
+        help="Install client files straight from the remote client zip without "
+        "downloading the whole archive.",
+    )
+    fetch_parser.add_argument(
+        "files",
+        nargs="*",
+        help="Paths relative to the installation folder, e.g. Data/common.MPQ. "
+        "Defaults to all client files.",
+    )
+    fetch_parser.set_defaults(func=run_fetch)
+
+    manifest_parser = subparsers.add_parser(
+        "manifest", help="Build an update manifest from a folder of client files."
+    )
+    manifest_parser.add_argument(
+        "folder", help="Folder with the same layout as the installation."
+    )
+    manifest_parser.add_argument(
+        "--base-url", required=True, help="URL the folder is served from."
+    )
+    manifest_parser.add_argument(
+        "-o", "--output", default="manifest.json", help="Output file."
+    )
+    manifest_parser.add_argument(
+        "--block-size",
+        type=int,
+        default=manifest.DEFAULT_BLOCK_SIZE,
+        help="Size of the blocks used for block-wise repairs.",
+    )
+    manifest_parser.add_argument(
+        "--workers", type=int, default=None, help="Number of hashing threads."
+    )
+    manifest_parser.set_defaults(func=run_manifest)
+
+    return parser
+
+
+def main(argv=None):
+    args = create_parser().parse_args(argv)
+    logger.info(f"Running headless command: {args.command}")
+    return args.func(args)
@@ -0,0 +1,99 @@
+import datetime
+import time
+import zoneinfo
+
+from PySide6.QtCore import QObject
+
+# Daily resets happen at 5:00 server time, weekly resets on Tuesdays
+RESET_TIMEZONE = zoneinfo.ZoneInfo("America/Los_Angeles")
+RESET_TIME = datetime.time(5, 0)
+WEEKLY_RESET_WEEKDAY = 1
+
+
+def next_daily_reset(now):
+    """
+    Args:
+    now (datetime.datetime): An aware datetime.
+
+    Returns:
+    datetime.datetime: The first daily reset after now, in RESET_TIMEZONE.
+    """
+    date = now.astimezone(RESET_TIMEZONE).date()
+    reset = datetime.datetime.combine(date, RESET_TIME, RESET_TIMEZONE)
+    if reset <= now:
+        # Combined again instead of adding a day, so DST changes are applied
+        date += datetime.timedelta(days=1)
+        reset = datetime.datetime.combine(date, RESET_TIME, RESET_TIMEZONE)
+    return reset
+
+
+def next_weekly_reset(now):
+    reset = next_daily_reset(now)
+    days = (WEEKLY_RESET_WEEKDAY - reset.weekday()) % 7
+    date = reset.date() + datetime.timedelta(days=days)
+    return datetime.datetime.combine(date, RESET_TIME, RESET_TIMEZONE)
+
+
+class ResetTimes:
+    """
+    The next daily and weekly reset. Both are only recomputed once the daily
+    reset has passed, i.e. once per day.
+    """
+
+    def __init__(self):
+        self.daily = None
+        self.weekly = None
+
+    def get(self, now=None):
+        """
+        Returns:
+        tuple: The next daily and weekly reset in the local timezone.
+        """
+        now = now or datetime.datetime.now(datetime.timezone.utc)
+        if self.daily is None or now >= self.daily:
+            self.daily = next_daily_reset(now).astimezone()
+            self.weekly = next_weekly_reset(now).astimezone()
+        return self.daily, self.weekly
+
+
+class Clock(QObject):
+    """
+    Calls every subscriber once a second from one shared scheduler job, with
+    the current time.time(). Subscribers are not called while the scheduler
+    is suspended unless they subscribed with while_suspended. Without
+    subscribers the job is removed.
+    """
+
+    def __init__(self, scheduler, parent=None):
+        super().__init__(parent)
+        self.scheduler = scheduler
+        self.subscribers = {}
+        self.suspendable = None
+
+    def subscribe(self, callback, while_suspended=False):
+        self.subscribers[callback] = while_suspended
+        self.update_job()
+
+    def unsubscribe(self, callback):
+        if self.subscribers.pop(callback, None) is not None:
+            self.update_job()
+
+    def update_job(self):
+        if not self.subscribers:
+            self.scheduler.remove("clock")
+            self.suspendable = None
+            return
+        suspendable = not any(self.subscribers.values())
+        if suspendable != self.suspendable:
+            self.scheduler.add("clock", self.tick, 1, suspendable=suspendable)
+            self.suspendable = suspendable
+
+    def tick(self):
+        now = time.time()
+        suspended = bool(self.scheduler.suspend_reasons)
+        for callback, while_suspended in list(self.subscribers.items()):
+            # An earlier callback may have unsubscribed it
+            if callback not in self.subscribers:
+                continue
+            if while_suspended or not suspended:
+                callback(now)
@@ -7,6 +7,51 @@ class Config:
         "Data/patch-Z.mpq": "https://duskhavenfiles.dev/patch-Z.mpq",
     }
 
+    # URL of a JSON update manifest as built by the 'manifest' command. If set,
+    # updates are checked against it instead of the per-file ETags of LINKS.
+    MANIFEST_URL = None
+
+    # Seconds for which the results of remote update checks are reused on the
+    # next launch before they are revalidated in the background
+    UPDATE_CHECK_TTL = 600
+
+    # Servers shown in the status bar, by label
+    SERVERS = {
+        "Game Server": ("51.75.147.219", 8086),
+        "Login Server": ("51.75.147.219", 3724),
+    }
+    # Servers probed with an auth logon challenge instead of a bare connect,
+    # so they only show as online while the authserver answers
+    AUTH_PROBE_SERVERS = ["Login Server"]
+
+    # (connect, read) timeout in seconds for requests to the file server
+    REQUEST_TIMEOUT = (5, 30)
+
+    # Top level folder inside the client zip
+    CLIENT_ZIP_ROOT = "WoW 3.3.5"
+
+    # Archives of the client zip that every installation has
+    CLIENT_ARCHIVES = [
+        "Data/common.MPQ",
+        "Data/common-2.MPQ",
+        "Data/expansion.MPQ",
+        "Data/lichking.MPQ",
+        "Data/patch.MPQ",
+        "Data/patch-2.MPQ",
+        "Data/patch-3.MPQ",
+    ]
+
+    # Client files removed or rewritten after extracting the client zip
+    REMOVED_CLIENT_FILES = [
+        "Wow.exe",
+        "Data/enUS/Interface/Cinematics/wow_fotlk_1024.avi",
+        "Data/enUS/Interface/Cinematics/wow_wrathgate_1024.avi",
+    ]
+    MODIFIED_CLIENT_FILES = [
+        "Data/enUS/realmlist.wtf",
+        "WTF/Config.wtf",
+    ]
+
     WOW_WTF_CONFIG = {
         "locale": "enUS",
         "hwDetect": "0",
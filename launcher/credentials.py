@@ -1,19 +1,10 @@
+import atexit
+import functools
 import logging
 import sys
+import threading
 import time
 
-import keyring
-from pynput.keyboard import Controller
-
-if sys.platform.startswith("win"):
-    from keyring.backends import Windows
-
-    keyring.set_keyring(Windows.WinVaultKeyring())
-elif sys.platform.startswith("linux"):
-    from keyring.backends import SecretService
-
-    keyring.set_keyring(SecretService.Keyring())
-
 logging.basicConfig(
     filename="launcher.log",
     filemode="a",
@@ -24,37 +15,158 @@ logging.basicConfig(
 
 logger = logging.getLogger("Password")
 
+# Seconds between key events, long enough for the client to see each one
+KEY_DELAY = 0.025
+
+SERVICE = "duskhaven_launcher"
+KEYS = ("account_name", "password")
+# Seconds to wait for further changes before writing them to the keyring
+WRITE_DELAY = 1.0
+# Seconds to wait for another thread reading the keyring, e.g. when starting
+# the game from the GUI thread while the keyring is still locked
+LOAD_TIMEOUT = 5
+
+
+@functools.cache
+def get_keyring():
+    """
+    Imports keyring and selects the platform backend on first use. Loading
+    the backend connects to D-Bus on Linux, so this is kept out of startup.
+    """
+    import keyring
+
+    if sys.platform.startswith("win"):
+        from keyring.backends import Windows
+
+        keyring.set_keyring(Windows.WinVaultKeyring())
+    elif sys.platform.startswith("linux"):
+        from keyring.backends import SecretService
+
+        keyring.set_keyring(SecretService.Keyring())
+    return keyring
+
+
+class CredentialStore:
+    """
+    Session cache in front of the keyring.
+
+    Both secrets are read from the keyring once, on the first access, and
+    later reads are served from memory. Writes update the cache at once and
+    are written to the keyring on a background thread after WRITE_DELAY
+    seconds without further changes, so typing never waits for the keyring.
+    Pending writes are flushed at exit.
+    """
+
+    def __init__(self, service=SERVICE):
+        self.service = service
+        self.lock = threading.Lock()
+        self.write_lock = threading.Lock()
+        self.values = {}
+        self.pending = {}
+        self.loading = False
+        self.loaded = threading.Event()
+        self.write_timer = None
+        atexit.register(self.flush)
+
+    def load(self):
+        """Reads the keyring, or waits until another thread has read it."""
+        with self.lock:
+            first = not self.loading
+            self.loading = True
+        if not first:
+            if not self.loaded.wait(LOAD_TIMEOUT):
+                logger.warning("Reading the keyring is taking too long")
+            return
+        values = {}
+        try:
+            keyring = get_keyring()
+            for key in KEYS:
+                values[key] = keyring.get_password(self.service, key)
+        except Exception as e:
+            logger.warning(f"Reading the keyring failed: {e}")
+        with self.lock:
+            # Values changed while loading are newer than the keyring's
+            for key, value in values.items():
+                self.values.setdefault(key, value)
+        self.loaded.set()
+
+    def get(self, key):
+        self.load()
+        return self.values.get(key)
+
+    def set(self, key, value):
+        """Sets a secret, or deletes it if value is None."""
+        with self.lock:
+            self.values[key] = value
+            self.pending[key] = value
+            if self.write_timer is not None:
+                self.write_timer.cancel()
+            self.write_timer = threading.Timer(WRITE_DELAY, self.flush)
+            self.write_timer.daemon = True
+            self.write_timer.start()
+
+    def delete(self, key):
+        self.set(key, None)
+
+    def flush(self):
+        """Writes pending changes to the keyring now."""
+        with self.write_lock:
+            with self.lock:
+                if self.write_timer is not None:
+                    self.write_timer.cancel()
+                    self.write_timer = None
+                pending, self.pending = self.pending, {}
+            if not pending:
+                return
+            failed = {}
+            try:
+                keyring = get_keyring()
+            except Exception as e:
+                logger.warning(f"Opening the keyring failed: {e}")
+                failed = pending
+            else:
+                for key, value in pending.items():
+                    try:
+                        if value is None:
+                            keyring.delete_password(self.service, key)
+                        else:
+                            keyring.set_password(self.service, key, value)
+                    except keyring.errors.PasswordDeleteError:
+                        pass
+                    except Exception as e:
+                        logger.warning(f"Writing {key} to the keyring failed: {e}")
+                        failed[key] = value
+            with self.lock:
+                # Retried by the next flush, unless changed again meanwhile
+                for key, value in failed.items():
+                    self.pending.setdefault(key, value)
+
+
+store = CredentialStore()
+
 
 def set_account_name(username):
-    keyring.set_password("duskhaven_launcher", "account_name", username)
+    store.set("account_name", username)
 
 
 def get_account_name():
-    return keyring.get_password("duskhaven_launcher", "account_name")
+    return store.get("account_name")
 
 
 def delete_account_name():
-    try:
-        keyring.delete_password("duskhaven_launcher", "account_name")
-        return True
-    except keyring.errors.PasswordDeleteError:
-        return False
+    store.delete("account_name")
 
 
 def set_password(password):
-    keyring.set_password("duskhaven_launcher", "password", password)
+    store.set("password", password)
 
 
 def get_password():
-    return keyring.get_password("duskhaven_launcher", "password")
+    return store.get("password")
 
 
 def delete_password():
-    try:
-        keyring.delete_password("duskhaven_launcher", "password")
-        return True
-    except keyring.errors.PasswordDeleteError:
-        return False
+    store.delete("password")
 
 
 def update_account_name(filename, new_account_name):
@@ -73,17 +185,21 @@ def update_account_name(filename, new_account_name):
 
 
 def type_key(key):
+    from pynput.keyboard import Controller
+
     keyboard = Controller()
     keyboard.press(key)
-    time.sleep(0.025)
+    time.sleep(KEY_DELAY)
     keyboard.release(key)
-    time.sleep(0.025)
+    time.sleep(KEY_DELAY)
 
 
 def type_password(password):
+    from pynput.keyboard import Controller
+
     keyboard = Controller()
     for ch in password:
         keyboard.press(ch)
-        time.sleep(0.025)
+        time.sleep(KEY_DELAY)
         keyboard.release(ch)
-        time.sleep(0.025)
+        time.sleep(KEY_DELAY)
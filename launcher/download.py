@@ -8,7 +8,8 @@ from datetime import datetime, timezone
 
 import requests
 
-from launcher import threads, utils
+from launcher import cache, http, threads, utils
+from launcher.config import Config
 
 logging.basicConfig(
     filename="launcher.log",
@@ -21,7 +22,34 @@ logging.basicConfig(
 logger = logging.getLogger("Download")
 
 
-def fetch_etag(url):
+def fetch_headers(url, ttl=None):
+    """
+    Fetches the ETag, last-modified time and size of the given URL with a
+    single HEAD request.
+
+    Args:
+    url (str): The URL to fetch the headers for.
+    ttl (float): If given, headers fetched less than ttl seconds ago are served
+    from the network cache without any request.
+
+    Returns:
+    dict: The "etag", "last-modified" and "content-length" headers.
+    """
+    if ttl:
+        headers = cache.network_cache.get(f"head:{url}", ttl)
+        if headers is not None:
+            return headers
+    response = http.session.head(url, timeout=Config.REQUEST_TIMEOUT)
+    response.raise_for_status()
+    headers = {
+        key: response.headers.get(key)
+        for key in ["etag", "last-modified", "content-length"]
+    }
+    cache.network_cache.set(f"head:{url}", headers)
+    return headers
+
+
+def fetch_etag(url, ttl=None):
     """
     Fetches the ETag for the given URL.
 
@@ -31,12 +59,10 @@ def fetch_etag(url):
     Returns:
     str: The ETag for the given URL.
     """
-    response = requests.head(url)
-    response.raise_for_status()
-    return response.headers.get("etag")
+    return fetch_headers(url, ttl)["etag"]
 
 
-def fetch_file_modified_time(url):
+def fetch_file_modified_time(url, ttl=None):
     """
     Fetches the file modified time for the given URL.
 
@@ -46,17 +72,14 @@ def fetch_file_modified_time(url):
     Returns:
     str: The file modified time for the given URL.
     """
-    response = requests.head(url)
-    response.raise_for_status()
-
-    date_string = response.headers.get("last-modified")
+    date_string = fetch_headers(url, ttl)["last-modified"]
     date_format = "%a, %d %b %Y %H:%M:%S %Z"
     # parse the date string and convert to UTC timezone
     date_utc = datetime.strptime(date_string, date_format).replace(tzinfo=timezone.utc)
     return date_utc
 
 
-def fetch_size(url):
+def fetch_size(url, ttl=None):
     """
     Fetches the size of the file at the given URL.
 
@@ -66,18 +89,16 @@ def fetch_size(url):
     Returns:
     int: The size of the file at the given URL.
     """
-    response = requests.head(url)
-    response.raise_for_status()
-    return int(response.headers.get("Content-Length", 0))
+    return int(fetch_headers(url, ttl)["content-length"] or 0)
 
 
-def check_etag(url, etag):
-    return etag == fetch_etag(url)
+def check_etag(url, etag, ttl=None):
+    return etag == fetch_etag(url, ttl)
 
 
-def file_requires_update(url, dest_path, etag):
+def file_requires_update(url, dest_path, etag, ttl=None):
     logger.info(f"Checking {dest_path}...")
-    etag_up_to_date = check_etag(url, etag)
+    etag_up_to_date = check_etag(url, etag, ttl)
     path_exists = dest_path is not None and dest_path.exists()
     if not path_exists:
         logger.info(f"{dest_path} does not exist yet...")
@@ -88,7 +109,7 @@ def file_requires_update(url, dest_path, etag):
         return False
     else:
         modified = datetime.fromtimestamp(dest_path.stat().st_mtime, tz=timezone.utc)
-        remote_modified = fetch_file_modified_time(url)
+        remote_modified = fetch_file_modified_time(url, ttl)
         if modified < remote_modified:
             logger.info(f"Remote for {dest_path} was modified...")
             return True
@@ -0,0 +1,108 @@
+"""
+Minimal stand-in for an authserver, for testing the status probes without
+the real login server.
+
+It answers every logon challenge with "unknown account" after an optional
+delay, or, when wedged, accepts connections and never answers, like an
+authserver whose worker threads are stuck.
+
+Usage: python -m launcher.fake_authserver [--port 3724] [--delay 0.1] [--wedged]
+"""
+
+import argparse
+import socketserver
+import struct
+import threading
+import time
+
+from launcher import server_status
+
+# Result code of an AUTH_LOGON_CHALLENGE answer for an unknown account
+WOW_FAIL_UNKNOWN_ACCOUNT = 0x04
+
+
+def read_exactly(connection, size):
+    data = b""
+    while len(data) < size:
+        chunk = connection.recv(size - len(data))
+        if not chunk:
+            return None
+        data += chunk
+    return data
+
+
+class ChallengeHandler(socketserver.BaseRequestHandler):
+    def handle(self):
+        header = read_exactly(self.request, 4)
+        if header is None:
+            return
+        command, _, size = struct.unpack("<BBH", header)
+        if command != server_status.AUTH_LOGON_CHALLENGE:
+            return
+        if read_exactly(self.request, size) is None:
+            return
+        self.server.challenges += 1
+        if self.server.wedged:
+            # Holds the connection open until the client gives up
+            self.server.stopped.wait()
+            return
+        time.sleep(self.server.delay)
+        self.request.sendall(
+            bytes([server_status.AUTH_LOGON_CHALLENGE, 0, WOW_FAIL_UNKNOWN_ACCOUNT])
+        )
+
+
+class FakeAuthServer(socketserver.ThreadingTCPServer):
+    """
+    Serves on a background thread while used as a context manager. Port 0
+    picks a free port, see address.
+    """
+
+    daemon_threads = True
+    allow_reuse_address = True
+
+    def __init__(self, host="127.0.0.1", port=0, delay=0, wedged=False):
+        super().__init__((host, port), ChallengeHandler)
+        self.delay = delay
+        self.wedged = wedged
+        self.challenges = 0
+        self.stopped = threading.Event()
+
+    @property
+    def address(self):
+        return self.server_address[:2]
+
+    def __enter__(self):
+        threading.Thread(target=self.serve_forever, daemon=True).start()
+        return self
+
+    def __exit__(self, *args):
+        self.stopped.set()
+        self.shutdown()
+        self.server_close()
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.split("\n\n")[0])
+    parser.add_argument("--host", default="127.0.0.1")
+    parser.add_argument("--port", type=int, default=3724)
+    parser.add_argument(
+        "--delay", type=float, default=0, help="Seconds to wait before answering"
+    )
+    parser.add_argument(
+        "--wedged", action="store_true", help="Accept connections but never answer"
+    )
+    args = parser.parse_args()
+    server = FakeAuthServer(args.host, args.port, args.delay, args.wedged)
+    print(f"Fake authserver listening on {args.host}:{server.address[1]}")
+    try:
+        server.serve_forever()
+    except KeyboardInterrupt:
+        pass
+    finally:
+        server.stopped.set()
+        server.server_close()
+
+
+if __name__ == "__main__":
+    main()
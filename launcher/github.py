@@ -0,0 +1,93 @@
+import logging
+import threading
+
+import requests
+
+from launcher import cache, http
+
+logging.basicConfig(
+    filename="launcher.log",
+    filemode="a",
+    format="%(asctime)s,%(msecs)d %(name)s %(levelname)s %(message)s",
+    datefmt="%H:%M:%S",
+    level=logging.INFO,
+)
+
+logger = logging.getLogger("GitHub")
+
+API_URL = "https://api.github.com"
+REPOSITORY = "chtheiss/duskhaven_launcher"
+# Only the first page of releases is fetched. It always contains the latest
+# release and is enough for the launcher news.
+RELEASES_PER_PAGE = 10
+
+# Serializes requests, so concurrent callers of the same endpoint share one
+# response through the cache
+request_lock = threading.Lock()
+
+
+def get(path, params=None, ttl=None):
+    """
+    Fetches a GitHub API endpoint with If-None-Match.
+
+    Response bodies are cached on disk together with their ETag. A 304 answer
+    returns the cached body and does not count against the rate limit. When
+    the rate limit is exceeded the cached body is returned as well.
+
+    Args:
+    path (str): The path of the endpoint, e.g. "/repos/{owner}/{repo}/releases".
+    params (dict): Query parameters.
+    ttl (float): If given, bodies cached less than ttl seconds ago are returned
+    without any request.
+
+    Returns:
+    The decoded JSON body, or None if rate limited before anything was
+    cached.
+    """
+    url = f"{API_URL}{path}"
+    key = "github:" + requests.Request("GET", url, params=params).prepare().url
+    with request_lock:
+        if ttl:
+            cached = cache.network_cache.get(key, ttl)
+            if cached is not None:
+                return cached["data"]
+
+        cached = cache.network_cache.get(key)
+        headers = {"Accept": "application/vnd.github+json"}
+        if cached is not None and cached.get("etag"):
+            headers["If-None-Match"] = cached["etag"]
+
+        response = http.get(url, params=params, headers=headers)
+        if response.status_code == 304:
+            logger.info(f"{path} not modified")
+            cache.network_cache.set(key, cached)
+            return cached["data"]
+        if response.status_code in (403, 429):
+            if cached is None:
+                logger.warning(f"Rate limited on {path}")
+                return None
+            logger.warning(f"Rate limited on {path}, using cached response")
+            return cached["data"]
+        response.raise_for_status()
+
+        data = response.json()
+        cache.network_cache.set(
+            key, {"etag": response.headers.get("etag"), "data": data}
+        )
+        return data
+
+
+def get_releases(ttl=None):
+    """Returns the first page of releases, newest first, or None."""
+    return get(f"/repos/{REPOSITORY}/releases", {"per_page": RELEASES_PER_PAGE}, ttl)
+
+
+def get_latest_release(ttl=None):
+    """
+    Returns the newest published release, like /releases/latest but from the
+    same cached response as get_releases, or None if there is none.
+    """
+    for release in get_releases(ttl) or []:
+        if not release.get("draft") and not release.get("prerelease"):
+            return release
+    return None
@@ -0,0 +1,125 @@
+import logging
+import os
+import pathlib
+import socket
+import subprocess
+import sys
+import time
+
+logging.basicConfig(
+    filename="launcher.log",
+    filemode="a",
+    format="%(asctime)s,%(msecs)d %(name)s %(levelname)s %(message)s",
+    datefmt="%H:%M:%S",
+    level=logging.INFO,
+)
+
+logger = logging.getLogger("Handoff")
+
+# Passed to the updated launcher as "<port>:<time the update was applied>"
+ENVIRONMENT_VARIABLE = "DUSKHAVEN_UPDATE_HANDOFF"
+READY_MESSAGE = b"ready"
+READY_TIMEOUT = 60
+# How often the old launcher checks whether the new one died while waiting
+POLL_INTERVAL = 0.1
+# Seconds a new launcher that did not report ready gets to exit when asked to
+TERMINATE_TIMEOUT = 5
+
+
+def get_launcher_path():
+    if getattr(sys, "frozen", False):
+        return pathlib.Path(sys.executable)
+    # Not frozen, the launcher script is run by the interpreter
+    return pathlib.Path(sys.argv[0]).resolve()
+
+
+def launcher_command(launcher_path):
+    if getattr(sys, "frozen", False):
+        return [str(launcher_path)]
+    return [sys.executable, str(launcher_path)]
+
+
+def detached_process_options():
+    if sys.platform.startswith("win"):
+        return {
+            "creationflags": subprocess.DETACHED_PROCESS
+            | subprocess.CREATE_NEW_PROCESS_GROUP
+        }
+    return {"start_new_session": True}
+
+
+class Handoff:
+    """
+    Starts the updated launcher detached from the running one and waits for
+    it to report that its window is up.
+    """
+
+    def __init__(self):
+        self.server = socket.create_server(("127.0.0.1", 0))
+        self.server.settimeout(POLL_INTERVAL)
+        self.process = None
+
+    def start(self, command):
+        port = self.server.getsockname()[1]
+        env = dict(os.environ)
+        env[ENVIRONMENT_VARIABLE] = f"{port}:{time.time()}"
+        self.process = subprocess.Popen(
+            command, env=env, close_fds=True, **detached_process_options()
+        )
+
+    def wait_until_ready(self, timeout=READY_TIMEOUT):
+        """
+        Returns:
+        bool: True once the new launcher reported ready, False if it exited
+        or did not report within timeout seconds.
+        """
+        deadline = time.monotonic() + timeout
+        try:
+            while time.monotonic() < deadline:
+                try:
+                    connection, _ = self.server.accept()
+                except socket.timeout:
+                    if self.process.poll() is not None:
+                        logger.error(
+                            f"New launcher exited with code {self.process.returncode}"
+                        )
+                        return False
+                    continue
+                with connection:
+                    connection.settimeout(1)
+                    if connection.recv(len(READY_MESSAGE)) == READY_MESSAGE:
+                        return True
+            logger.error("New launcher did not report ready in time")
+            # It must not keep starting while the old launcher is restored
+            self.terminate()
+            return False
+        finally:
+            self.server.close()
+
+    def terminate(self):
+        self.process.terminate()
+        try:
+            self.process.wait(TERMINATE_TIMEOUT)
+        except subprocess.TimeoutExpired:
+            self.process.kill()
+            self.process.wait()
+
+
+def notify_ready():
+    """
+    Tells the launcher that started this one that the window is up.
+
+    Returns:
+    float: Seconds since the update was applied, or None if this launcher was
+    not started by an update.
+    """
+    value = os.environ.pop(ENVIRONMENT_VARIABLE, None)
+    if value is None:
+        return None
+    port, update_time = value.split(":", 1)
+    try:
+        with socket.create_connection(("127.0.0.1", int(port)), timeout=1) as c:
+            c.sendall(READY_MESSAGE)
+    except OSError as e:
+        logger.warning(f"Reporting ready to the old launcher failed: {e}")
+    return time.time() - float(update_time)
@@ -0,0 +1,135 @@
+import logging
+import random
+import threading
+import time
+import urllib.parse
+
+import requests
+from requests.adapters import HTTPAdapter
+
+from launcher.config import Config
+
+logging.basicConfig(
+    filename="launcher.log",
+    filemode="a",
+    format="%(asctime)s,%(msecs)d %(name)s %(levelname)s %(message)s",
+    datefmt="%H:%M:%S",
+    level=logging.INFO,
+)
+
+logger = logging.getLogger("HTTP")
+
+# Consecutive failures after which an endpoint is not requested for a while
+FAILURE_THRESHOLD = 3
+# Seconds an open circuit waits before letting a single trial request through
+RESET_TIMEOUT = 60
+
+
+class CircuitOpenError(requests.ConnectionError):
+    pass
+
+
+class CircuitBreaker:
+    """
+    Stops requests to an endpoint after FAILURE_THRESHOLD consecutive
+    failures. After reset_timeout seconds one trial request is let through,
+    which closes the circuit again if it succeeds.
+    """
+
+    def __init__(
+        self, failure_threshold=FAILURE_THRESHOLD, reset_timeout=RESET_TIMEOUT
+    ):
+        self.failure_threshold = failure_threshold
+        self.reset_timeout = reset_timeout
+        self.failures = 0
+        self.opened_at = None
+        self.lock = threading.Lock()
+
+    def allow(self):
+        with self.lock:
+            if self.opened_at is None:
+                return True
+            if time.monotonic() - self.opened_at >= self.reset_timeout:
+                # Half-open: the next failure opens the circuit again
+                self.opened_at = time.monotonic()
+                return True
+            return False
+
+    def record_success(self):
+        with self.lock:
+            self.failures = 0
+            self.opened_at = None
+
+    def record_failure(self):
+        with self.lock:
+            self.failures += 1
+            if self.failures >= self.failure_threshold:
+                self.opened_at = time.monotonic()
+
+
+class Backoff:
+    """Exponentially growing retry delays with full jitter."""
+
+    def __init__(self, base=2, maximum=300):
+        self.base = base
+        self.maximum = maximum
+        self.attempts = 0
+
+    def next_delay(self):
+        delay = min(self.maximum, self.base * 2**self.attempts)
+        self.attempts += 1
+        return random.uniform(delay / 2, delay)
+
+    def reset(self):
+        self.attempts = 0
+
+
+def create_session():
+    session = requests.Session()
+    adapter = HTTPAdapter(pool_connections=8, pool_maxsize=8)
+    session.mount("https://", adapter)
+    session.mount("http://", adapter)
+    return session
+
+
+# Shared by all short requests, so connections to the same host are reused.
+# Only the UI data fetches of news and GitHub go through the circuit breakers,
+# the file server is requested from the session directly.
+session = create_session()
+breakers = {}
+breakers_lock = threading.Lock()
+
+
+def get_breaker(url):
+    parts = urllib.parse.urlsplit(url)
+    endpoint = f"{parts.netloc}{parts.path}"
+    with breakers_lock:
+        return breakers.setdefault(endpoint, CircuitBreaker())
+
+
+def request(method, url, **kwargs):
+    """
+    Sends a request through the shared session and the circuit breaker of
+    the endpoint. Connection errors and server errors count as failures.
+
+    Raises:
+    CircuitOpenError: If the endpoint failed too often recently.
+    """
+    breaker = get_breaker(url)
+    if not breaker.allow():
+        raise CircuitOpenError(f"Skipping {url} after repeated failures")
+    kwargs.setdefault("timeout", Config.REQUEST_TIMEOUT)
+    try:
+        response = session.request(method, url, **kwargs)
+    except requests.RequestException:
+        breaker.record_failure()
+        raise
+    if response.status_code >= 500:
+        breaker.record_failure()
+    else:
+        breaker.record_success()
+    return response
+
+
+def get(url, **kwargs):
+    return request("GET", url, **kwargs)
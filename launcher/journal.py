@@ -0,0 +1,111 @@
+import json
+import logging
+import os
+import threading
+from pathlib import Path
+
+logging.basicConfig(
+    filename="launcher.log",
+    filemode="a",
+    format="%(asctime)s,%(msecs)d %(name)s %(levelname)s %(message)s",
+    datefmt="%H:%M:%S",
+    level=logging.INFO,
+)
+
+logger = logging.getLogger("Journal")
+
+# Configuration keys holding the state of the download queue
+DOWNLOAD_STATE_KEYS = frozenset(
+    ["download_queue", "paused_download_etag", "file_versions", "install_in_progress"]
+)
+# The journal is rewritten as a snapshot once it holds this many records
+COMPACTION_THRESHOLD = 256
+
+
+class Journal:
+    """
+    Append-only log of changes to a few keys.
+
+    Every change appends a single JSON line, which is cheap and cannot corrupt
+    earlier records. Loading replays the lines in order, ignoring a torn last
+    line from a crash during an append. Once the log grows beyond
+    COMPACTION_THRESHOLD records it is atomically replaced by one record per
+    key.
+
+    The file is only open during an append, so another launcher process, e.g.
+    the new one after a self-update, can compact it at any time.
+    """
+
+    def __init__(self, filename, keys=DOWNLOAD_STATE_KEYS):
+        self.filename = Path(filename)
+        self.keys = keys
+        self.lock = threading.Lock()
+        self.state = {}
+        self.records = 0
+
+    def load(self):
+        """Replays the journal and returns the recovered state."""
+        with self.lock:
+            self.state = {}
+            self.records = 0
+            torn = False
+            try:
+                with self.filename.open("rb") as f:
+                    for line in f:
+                        try:
+                            record = json.loads(line)
+                        except ValueError:
+                            # Only the last line can be torn, nothing follows
+                            torn = True
+                            break
+                        self._apply(record)
+                        self.records += 1
+            except FileNotFoundError:
+                pass
+            # A torn line has to go, or the next append would be joined to it
+            if torn or self.records > COMPACTION_THRESHOLD:
+                self._compact()
+            return dict(self.state)
+
+    def _apply(self, record):
+        if "set" in record:
+            self.state[record["set"]] = record["value"]
+        elif "delete" in record:
+            self.state.pop(record["delete"], None)
+
+    def _write(self, record):
+        with self.filename.open("a") as f:
+            f.write(json.dumps(record, separators=(",", ":")) + "\n")
+            f.flush()
+            os.fsync(f.fileno())
+        self._apply(record)
+        self.records += 1
+        if self.records > COMPACTION_THRESHOLD:
+            self._compact()
+
+    def _compact(self):
+        temp_filename = self.filename.with_name(f"{self.filename.name}.tmp")
+        try:
+            with temp_filename.open("w") as f:
+                for key, value in self.state.items():
+                    f.write(
+                        json.dumps({"set": key, "value": value}, separators=(",", ":"))
+                        + "\n"
+                    )
+                f.flush()
+                os.fsync(f.fileno())
+            os.replace(temp_filename, self.filename)
+        except OSError as e:
+            # The uncompacted journal still holds every change
+            logger.warning(f"Compacting {self.filename} failed: {e}")
+            return
+        self.records = len(self.state)
+
+    def set(self, key, value):
+        with self.lock:
+            self._write({"set": key, "value": value})
+
+    def delete(self, key):
+        with self.lock:
+            if key in self.state:
+                self._write({"delete": key})
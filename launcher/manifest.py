@@ -0,0 +1,184 @@
+import hashlib
+import json
+import logging
+import os
+import pathlib
+import time
+import urllib.parse
+from concurrent.futures import ThreadPoolExecutor
+
+import requests
+
+from launcher import cache, http, verify
+from launcher.config import Config
+
+logging.basicConfig(
+    filename="launcher.log",
+    filemode="a",
+    format="%(asctime)s,%(msecs)d %(name)s %(levelname)s %(message)s",
+    datefmt="%H:%M:%S",
+    level=logging.INFO,
+)
+
+logger = logging.getLogger("Manifest")
+
+CACHE_FILENAME = "update_manifest.json"
+DEFAULT_BLOCK_SIZE = 4 * 1024 * 1024
+
+
+def describe_file(path, block_size=DEFAULT_BLOCK_SIZE, algorithm=verify.HASH_ALGORITHM):
+    """
+    Computes the manifest entry of a single file in one pass: its size, the
+    digest of the whole file and the digest of every block_size bytes.
+    """
+    whole = hashlib.new(algorithm)
+    blocks = []
+    size = 0
+    with open(path, "rb") as file:
+        while block := file.read(block_size):
+            whole.update(block)
+            blocks.append(hashlib.new(algorithm, block).hexdigest())
+            size += len(block)
+    return {
+        "size": size,
+        "digest": whole.hexdigest(),
+        "block_size": block_size,
+        "blocks": blocks,
+    }
+
+
+def build_manifest(
+    folder,
+    base_url,
+    block_size=DEFAULT_BLOCK_SIZE,
+    algorithm=verify.HASH_ALGORITHM,
+    max_workers=None,
+):
+    """
+    Builds an update manifest from all files below folder.
+
+    Args:
+    folder (pathlib.Path): The folder mirroring the installation layout.
+    base_url (str): The URL the folder is served from.
+    block_size (int): Size of the blocks used for block-wise repairs.
+    algorithm (str): The hashlib algorithm of all digests.
+    max_workers (int): Size of the hashing thread pool.
+
+    Returns:
+    dict: The manifest, mapping paths relative to the installation folder to
+    their size, digest, block digests and download URL.
+    """
+    folder = pathlib.Path(folder)
+    files = sorted(
+        path.relative_to(folder).as_posix()
+        for path in folder.glob("**/*")
+        if path.is_file()
+    )
+    with ThreadPoolExecutor(max_workers=max_workers) as executor:
+        entries = executor.map(
+            lambda file: describe_file(folder / file, block_size, algorithm), files
+        )
+        manifest_files = dict(zip(files, entries))
+
+    base_url = base_url.rstrip("/")
+    for file, entry in manifest_files.items():
+        entry["url"] = f"{base_url}/{urllib.parse.quote(file)}"
+
+    return {
+        "version": 1,
+        "generated": int(time.time()),
+        "algorithm": algorithm,
+        "files": manifest_files,
+    }
+
+
+def load_cached_manifest():
+    """Returns the last fetched manifest and its ETag."""
+    try:
+        with open(CACHE_FILENAME) as f:
+            cache = json.load(f)
+        return cache["manifest"], cache.get("etag")
+    except (FileNotFoundError, KeyError, json.decoder.JSONDecodeError):
+        return None, None
+
+
+def save_cached_manifest(manifest, etag):
+    temp_filename = f"{CACHE_FILENAME}.tmp"
+    with open(temp_filename, "w") as f:
+        json.dump({"etag": etag, "manifest": manifest}, f)
+    os.replace(temp_filename, CACHE_FILENAME)
+
+
+def fetch_manifest(url, ttl=None):
+    """
+    Fetches the update manifest with If-None-Match.
+
+    Args:
+    url (str): The URL of the manifest.
+    ttl (float): If given, the cached manifest is used without any request when
+    it was checked less than ttl seconds ago.
+
+    Returns:
+    tuple: The manifest and whether it changed since the last fetch. A 304
+    answer returns the cached manifest, so checking for updates costs a single
+    round-trip when nothing changed.
+    """
+    cached_manifest, etag = load_cached_manifest()
+    if ttl and cached_manifest is not None:
+        if cache.network_cache.get(f"manifest:{url}", ttl):
+            return cached_manifest, False
+    headers = {}
+    if cached_manifest is not None and etag:
+        headers["If-None-Match"] = etag
+
+    response = http.session.get(url, headers=headers, timeout=Config.REQUEST_TIMEOUT)
+    if response.status_code == 304:
+        logger.info("Update manifest not modified")
+        cache.network_cache.set(f"manifest:{url}", True)
+        return cached_manifest, False
+    response.raise_for_status()
+
+    manifest = response.json()
+    manifest.setdefault("algorithm", verify.HASH_ALGORITHM)
+    save_cached_manifest(manifest, response.headers.get("etag"))
+    cache.network_cache.set(f"manifest:{url}", True)
+    logger.info(f"Fetched update manifest with {len(manifest['files'])} files")
+    return manifest, True
+
+
+def find_outdated_files(url, install_folder, ttl=None, files=None):
+    """
+    Compares the installation against the remote manifest.
+
+    Local files are compared through the persistent hash index instead of
+    modification times, so only files that changed on disk are hashed again.
+    If the manifest cannot be fetched, the cached one is used.
+
+    Args:
+    files (collection): Only these files are compared, if given.
+
+    Returns:
+    list: The paths, relative to the installation folder, of all files that
+    are missing or differ from the manifest.
+    """
+    try:
+        manifest, _ = fetch_manifest(url, ttl)
+    except (requests.RequestException, ValueError) as e:
+        logger.warning(f"Fetching the update manifest failed: {e}")
+        manifest, _ = load_cached_manifest()
+        if manifest is None:
+            return []
+    if files is not None:
+        manifest = dict(manifest)
+        manifest["files"] = {
+            file: entry for file, entry in manifest["files"].items() if file in files
+        }
+    return sorted(verify.verify_install(install_folder, manifest, verify.HashIndex()))
+
+
+def file_url(file):
+    """Returns the download URL of a file from the cached manifest, if any."""
+    manifest, _ = load_cached_manifest()
+    if manifest is None:
+        return None
+    return manifest["files"].get(file, {}).get("url")
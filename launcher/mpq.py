@@ -0,0 +1,280 @@
+import logging
+import mmap
+import pathlib
+import struct
+import time
+
+logging.basicConfig(
+    filename="launcher.log",
+    filemode="a",
+    format="%(asctime)s,%(msecs)d %(name)s %(levelname)s %(message)s",
+    datefmt="%H:%M:%S",
+    level=logging.INFO,
+)
+
+logger = logging.getLogger("MPQ")
+
+HEADER_MAGIC = b"MPQ\x1a"
+USER_DATA_MAGIC = b"MPQ\x1b"
+# The header is searched at every 512 byte boundary up to this offset
+HEADER_SEARCH_LIMIT = 1024 * 1024
+
+HASH_ENTRY_EMPTY = 0xFFFFFFFF
+HASH_ENTRY_DELETED = 0xFFFFFFFE
+FILE_EXISTS = 0x80000000
+
+
+class MPQError(ValueError):
+    pass
+
+
+def _prepare_crypt_table():
+    table = [0] * 0x500
+    seed = 0x00100001
+    for index1 in range(0x100):
+        index2 = index1
+        for _ in range(5):
+            seed = (seed * 125 + 3) % 0x2AAAAB
+            temp1 = (seed & 0xFFFF) << 0x10
+            seed = (seed * 125 + 3) % 0x2AAAAB
+            temp2 = seed & 0xFFFF
+            table[index2] = temp1 | temp2
+            index2 += 0x100
+    return table
+
+
+CRYPT_TABLE = _prepare_crypt_table()
+
+
+def hash_string(string, hash_type):
+    seed1 = 0x7FED7FED
+    seed2 = 0xEEEEEEEE
+    for ch in string.upper().encode("ascii"):
+        value = CRYPT_TABLE[(hash_type << 8) + ch]
+        seed1 = (value ^ (seed1 + seed2)) & 0xFFFFFFFF
+        seed2 = (ch + seed1 + seed2 + (seed2 << 5) + 3) & 0xFFFFFFFF
+    return seed1
+
+
+HASH_TABLE_KEY = hash_string("(hash table)", 3)
+BLOCK_TABLE_KEY = hash_string("(block table)", 3)
+
+
+def decrypt_words(words, key):
+    """Lazily decrypts an iterable of encrypted uint32 values."""
+    seed = 0xEEEEEEEE
+    for value in words:
+        seed = (seed + CRYPT_TABLE[0x400 + (key & 0xFF)]) & 0xFFFFFFFF
+        plain = value ^ ((key + seed) & 0xFFFFFFFF)
+        key = ((((~key) << 0x15) + 0x11111111) | (key >> 0x0B)) & 0xFFFFFFFF
+        seed = (plain + seed + (seed << 5) + 3) & 0xFFFFFFFF
+        yield plain
+
+
+class MPQArchive:
+    """
+    Memory-mapped reader for the headers and tables of an MPQ archive.
+
+    Opening an archive only parses and validates the header and the bounds of
+    the hash and block tables. The table entries are decrypted lazily when they
+    are enumerated.
+    """
+
+    def __init__(self, path):
+        self.path = pathlib.Path(path)
+        self.file = open(self.path, "rb")
+        try:
+            self.file_size = self.path.stat().st_size
+            if self.file_size == 0:
+                raise MPQError(f"{self.path.name} is empty")
+            self.mapped = mmap.mmap(self.file.fileno(), 0, access=mmap.ACCESS_READ)
+            self.read_header()
+            self.validate()
+        except Exception:
+            self.close()
+            raise
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc_info):
+        self.close()
+
+    def close(self):
+        if getattr(self, "mapped", None) is not None:
+            self.mapped.close()
+            self.mapped = None
+        self.file.close()
+
+    def find_header_offset(self):
+        for offset in range(0, min(self.file_size, HEADER_SEARCH_LIMIT), 0x200):
+            magic = self.mapped[offset : offset + 4]
+            if magic == HEADER_MAGIC:
+                return offset
+            if magic == USER_DATA_MAGIC and offset + 12 <= self.file_size:
+                (header_offset,) = struct.unpack_from("<I", self.mapped, offset + 8)
+                if (
+                    self.mapped[offset + header_offset : offset + header_offset + 4]
+                    == HEADER_MAGIC
+                ):
+                    return offset + header_offset
+        raise MPQError(f"{self.path.name} has no MPQ header")
+
+    def read_header(self):
+        self.header_offset = self.find_header_offset()
+        if self.header_offset + 32 > self.file_size:
+            raise MPQError(f"{self.path.name} has a truncated header")
+        (
+            self.header_size,
+            self.archive_size,
+            self.format_version,
+            sector_size_shift,
+            hash_table_pos,
+            block_table_pos,
+            self.hash_table_entries,
+            self.block_table_entries,
+        ) = struct.unpack_from("<IIHHIIII", self.mapped, self.header_offset + 4)
+        self.sector_size = 512 << sector_size_shift
+        self.hash_table_pos = hash_table_pos
+        self.block_table_pos = block_table_pos
+        self.hi_block_table_pos = 0
+
+        if self.format_version >= 1:
+            if self.header_offset + 44 > self.file_size:
+                raise MPQError(f"{self.path.name} has a truncated header")
+            (
+                self.hi_block_table_pos,
+                hash_table_pos_hi,
+                block_table_pos_hi,
+            ) = struct.unpack_from("<QHH", self.mapped, self.header_offset + 32)
+            self.hash_table_pos |= hash_table_pos_hi << 32
+            self.block_table_pos |= block_table_pos_hi << 32
+        if self.format_version >= 2 and self.header_size >= 52:
+            (self.archive_size,) = struct.unpack_from(
+                "<Q", self.mapped, self.header_offset + 44
+            )
+
+    def validate(self):
+        """Checks the header, archive size and table bounds."""
+        name = self.path.name
+        if self.format_version > 3:
+            raise MPQError(f"{name} has unknown format version {self.format_version}")
+        if self.header_size < 32:
+            raise MPQError(f"{name} has an invalid header size {self.header_size}")
+        if self.header_offset + self.archive_size > self.file_size:
+            raise MPQError(
+                f"{name} is truncated: expected "
+                f"{self.header_offset + self.archive_size} bytes, "
+                f"found {self.file_size}"
+            )
+        tables = [
+            ("hash table", self.hash_table_pos, self.hash_table_entries * 16),
+            ("block table", self.block_table_pos, self.block_table_entries * 16),
+        ]
+        if self.hi_block_table_pos:
+            tables.append(
+                (
+                    "hi-block table",
+                    self.hi_block_table_pos,
+                    self.block_table_entries * 2,
+                )
+            )
+        for table, position, size in tables:
+            if position + size > self.archive_size:
+                raise MPQError(f"The {table} of {name} is out of bounds")
+        if self.hash_table_entries & (self.hash_table_entries - 1):
+            raise MPQError(f"The hash table size of {name} is not a power of two")
+
+    def _read_table(self, position, entries, key):
+        start = self.header_offset + position
+        words = struct.iter_unpack("<I", self.mapped[start : start + entries * 16])
+        decrypted = decrypt_words((word for (word,) in words), key)
+        for _ in range(entries):
+            yield tuple(next(decrypted) for _ in range(4))
+
+    def hash_entries(self):
+        """
+        Lazily yields the decrypted hash table entries as tuples of
+        (name1, name2, locale, platform, block_index).
+        """
+        for name1, name2, locale_platform, block_index in self._read_table(
+            self.hash_table_pos, self.hash_table_entries, HASH_TABLE_KEY
+        ):
+            yield (
+                name1,
+                name2,
+                locale_platform & 0xFFFF,
+                locale_platform >> 16,
+                block_index,
+            )
+
+    def block_entries(self):
+        """
+        Lazily yields the decrypted block table entries as tuples of
+        (file_position, compressed_size, file_size, flags).
+        """
+        hi_start = self.header_offset + self.hi_block_table_pos
+        for index, (position, compressed_size, file_size, flags) in enumerate(
+            self._read_table(
+                self.block_table_pos, self.block_table_entries, BLOCK_TABLE_KEY
+            )
+        ):
+            if self.hi_block_table_pos:
+                (position_hi,) = struct.unpack_from(
+                    "<H", self.mapped, hi_start + index * 2
+                )
+                position |= position_hi << 32
+            yield position, compressed_size, file_size, flags
+
+    def validate_entries(self):
+        """
+        Checks that every used hash entry points to an existing block and that
+        every existing block lies inside the archive. This decrypts both tables
+        and is considerably slower than the checks done when opening.
+        """
+        for *_, block_index in self.hash_entries():
+            if block_index in (HASH_ENTRY_EMPTY, HASH_ENTRY_DELETED):
+                continue
+            if block_index >= self.block_table_entries:
+                raise MPQError(f"{self.path.name} has an invalid hash table entry")
+        for position, compressed_size, _, flags in self.block_entries():
+            if flags & FILE_EXISTS and position + compressed_size > self.archive_size:
+                raise MPQError(f"{self.path.name} has a file out of bounds")
+
+
+def find_archives(data_folder):
+    data_folder = pathlib.Path(data_folder)
+    return sorted(
+        path
+        for path in data_folder.glob("**/*")
+        if path.suffix.lower() == ".mpq" and path.is_file()
+    )
+
+
+def check_archives(data_folder, deep=False):
+    """
+    Checks the structure of all MPQ archives in the data folder.
+
+    Args:
+    data_folder (pathlib.Path): The Data folder of the installation.
+    deep (bool): Whether to also validate every table entry.
+
+    Returns:
+    dict: Maps the paths of damaged archives to a description of the problem.
+    """
+    start_time = time.perf_counter()
+    problems = {}
+    archives = find_archives(data_folder)
+    for path in archives:
+        try:
+            with MPQArchive(path) as archive:
+                if deep:
+                    archive.validate_entries()
+        except (OSError, MPQError, struct.error) as e:
+            logger.warning(f"Damaged archive {path}: {e}")
+            problems[path] = str(e)
+    logger.info(
+        f"Checked {len(archives)} archives in "
+        f"{(time.perf_counter() - start_time) * 1000:.1f}ms"
+    )
+    return problems
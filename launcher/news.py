@@ -1,100 +1,157 @@
-import json
 import re
 import time
-from datetime import datetime
+from datetime import datetime, timezone
 
-import pytz
-import requests
+from launcher import cache, github, http
+
+RELEASE_NOTES_TTL = 60
+
+MENTION_PATTERN = re.compile(r"@Notify: Updates|@everyone|@here|@Updates")
+DATE_PATTERN = re.compile(r"\d{2}\.\d{2}\.\d{4}")
+BOLD_PATTERN = re.compile(r"\*\*(\w+)\*\*")  # Matches "**<word>**"
+
+# Items of every news type, so they can be shown before anything is fetched,
+# and the ETag of each news channel
+news_cache = cache.JsonCache("news_cache.json")
+# Maps message ids to the message time and content and the item made from it
+processed_messages = {}
 
 
 def convert_timestamp_to_local_time(timestamp):
-    local_time = datetime.fromtimestamp(
-        timestamp / 1000, tz=pytz.timezone("UTC")
-    ).astimezone()
+    local_time = datetime.fromtimestamp(timestamp / 1000, tz=timezone.utc).astimezone()
     formatted_time = local_time.strftime("%B %e at %#I:%M %p").replace("  ", " ")
     return formatted_time
 
 
 def fetch_announcements():
-    url = "https://duskhaven-news.glitch.me/announcements"
-    try:
-        news = fetch_news(url)
-    except requests.exceptions.ConnectionError:
-        return []
-    return news
+    return fetch_news("https://duskhaven-news.glitch.me/announcements")
 
 
 def fetch_changelog():
-    url = "https://duskhaven-news.glitch.me/changelog"
-    try:
-        news = fetch_news(url)
-    except requests.exceptions.ConnectionError:
-        return []
-    return news
+    return fetch_news("https://duskhaven-news.glitch.me/changelog")
 
 
 def fetch_news(url):
-    try:
-        response = requests.get(url, timeout=0.5)
-    except requests.exceptions.Timeout:
-        return []
-    try:
-        news = response.json()
-    except json.decoder.JSONDecodeError:
-        return []
-
-    news = [n for n in news if n["content"] != "[Original Message Deleted]"]
-    news = [
-        {
-            "timestamp": convert_timestamp_to_local_time(n["createdTimestamp"]),
-            "content": n["content"],
-        }
-        for n in news
+    """
+    Fetches the items of a news channel. An empty list means the channel is
+    empty, None that it did not change since the last fetch.
+
+    Raises:
+    requests.RequestException: If the request fails.
+    ValueError: If the response is not a list of messages.
+    """
+    etag_key = f"etag:{url}"
+    headers = {}
+    etag = news_cache.get(etag_key)
+    if etag is not None:
+        headers["If-None-Match"] = etag
+    response = http.get(url, headers=headers)
+    if response.status_code == 304:
+        return None
+    response.raise_for_status()
+    news = response.json()
+    if not isinstance(news, list):
+        raise ValueError(f"Unexpected response from {url}")
+
+    items = [
+        process_message(n) for n in news if n["content"] != "[Original Message Deleted]"
     ]
-    for n in news:
-        n["content"] = n["content"].replace("@everyone", "")
-        n["content"] = n["content"].replace("@here", "")
-        n["content"] = n["content"].replace("@Updates", "")
-        n["content"] = n["content"].replace("@Notify: Updates", "")
-
-        pattern = r"\d{2}\.\d{2}\.\d{4}"
-        n["content"] = re.sub(pattern, "", n["content"], flags=re.MULTILINE)
+    if "ETag" in response.headers:
+        news_cache.set(etag_key, response.headers["ETag"])
+    return items
+
+
+def process_message(message):
+    """
+    Converts a message to a news item. The result is reused for as long as
+    the message id, time and content stay the same.
+    """
+    item_id = str(message.get("id", message["createdTimestamp"]))
+    source = (message["createdTimestamp"], message["content"])
+    cached = processed_messages.get(item_id)
+    if cached is not None and cached[0] == source:
+        return cached[1]
+
+    content = MENTION_PATTERN.sub("", message["content"])
+    content = DATE_PATTERN.sub("", content)
+    content = BOLD_PATTERN.sub(r"<b>\1</b>", content)
+    item = {
+        "id": item_id,
+        "created": message["createdTimestamp"],
+        "timestamp": convert_timestamp_to_local_time(message["createdTimestamp"]),
+        "content": content.strip(),
+    }
+    processed_messages[item_id] = (source, item)
+    return item
 
-        pattern = r"\*\*(\w+)\*\*"  # Matches "**<word>**"
-        n["content"] = re.sub(pattern, r"<b>\1</b>", n["content"], flags=re.MULTILINE)
 
-        n["content"] = n["content"].strip()
+def get_release_notes():
+    # Shares the cached releases response with the launcher update check
+    data = github.get_releases(RELEASE_NOTES_TTL)
+    if data is None:
+        # Rate limited, the cached release notes are kept
+        return None
+
+    release_notes = []
+    for release in data:
+        created = (
+            int(
+                time.mktime(
+                    datetime.strptime(
+                        release["created_at"], "%Y-%m-%dT%H:%M:%SZ"
+                    ).timetuple()
+                )
+            )
+            * 1000
+        )
+        release_notes.append(
+            {
+                "id": str(release["id"]),
+                "created": created,
+                "content": release["name"] + "\n\n" + release["body"],
+                "timestamp": convert_timestamp_to_local_time(created),
+            }
+        )
 
-    return news
+    return release_notes
 
 
-def get_release_notes():
-    # Construct the URL for the GitHub API request
-    url = "https://api.github.com/repos/chtheiss/duskhaven_launcher/releases"
-
-    # Make the API request and parse the response as JSON
-    response = requests.get(url)
-    data = response.json()
-
-    if "message" in data and data["message"].startswith("API rate limit exceeded for"):
-        return []
-
-    release_notes = [
-        {
-            "content": release["name"] + "\n\n" + release["body"],
-            "timestamp": convert_timestamp_to_local_time(
-                int(
-                    time.mktime(
-                        datetime.strptime(
-                            release["created_at"], "%Y-%m-%dT%H:%M:%SZ"
-                        ).timetuple()
-                    )
-                )
-                * 1000
-            ),
-        }
-        for release in data
+def merge_news(cached, fresh):
+    """
+    Merges freshly fetched items into the cached ones by id.
+
+    Fetched items replace cached items with the same id. Cached items older
+    than everything fetched are kept, since they were only outside of the
+    fetched window. Newer cached items that were not fetched again were
+    deleted.
+
+    Args:
+    cached (list): The cached items.
+    fresh (list): The fetched items, or None if nothing changed.
+
+    Returns:
+    list: The merged items, newest first.
+    """
+    if not fresh:
+        return cached
+    oldest = min(item["created"] for item in fresh)
+    fresh_ids = {item["id"] for item in fresh}
+    older = [
+        item
+        for item in cached
+        if item["created"] < oldest and item["id"] not in fresh_ids
     ]
+    return sorted(fresh + older, key=lambda item: item["created"], reverse=True)
 
-    # Return the results as a tuple
-    return release_notes
+
+def get_cached_news(news_type):
+    return news_cache.get(news_type, default=[])
+
+
+def update_news(news_type, fresh):
+    """Merges fetched items into the cache and returns the merged items."""
+    cached = get_cached_news(news_type)
+    merged = merge_news(cached, fresh)
+    if merged != cached:
+        news_cache.set(news_type, merged)
+    return merged
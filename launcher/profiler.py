@@ -0,0 +1,75 @@
+import builtins
+import logging
+import os
+import sys
+import time
+
+logging.basicConfig(
+    filename="launcher.log",
+    filemode="a",
+    format="%(asctime)s,%(msecs)d %(name)s %(levelname)s %(message)s",
+    datefmt="%H:%M:%S",
+    level=logging.INFO,
+)
+
+logger = logging.getLogger("Profiler")
+
+# Startup profiling is enabled by setting this environment variable or by
+# passing the command line flag
+ENVIRONMENT_VARIABLE = "DUSKHAVEN_PROFILE_STARTUP"
+COMMAND_LINE_FLAG = "--profile-startup"
+REPORTED_IMPORTS = 20
+
+start_time = time.perf_counter()
+enabled = False
+phases = []
+import_times = {}
+_original_import = builtins.__import__
+
+
+def _timed_import(name, globals=None, locals=None, fromlist=(), level=0):
+    if level or name in sys.modules:
+        return _original_import(name, globals, locals, fromlist, level)
+    import_start = time.perf_counter()
+    try:
+        return _original_import(name, globals, locals, fromlist, level)
+    finally:
+        # Times include the nested imports, like python -X importtime
+        import_times.setdefault(name, time.perf_counter() - import_start)
+
+
+def enable():
+    global enabled
+    enabled = True
+    builtins.__import__ = _timed_import
+
+
+def mark(phase):
+    """Records the end of a startup phase."""
+    if enabled:
+        phases.append((phase, time.perf_counter()))
+
+
+def report():
+    """Logs the duration of all phases and the slowest imports."""
+    global enabled
+    if not enabled:
+        return
+    enabled = False
+    builtins.__import__ = _original_import
+
+    previous = start_time
+    for phase, timestamp in phases:
+        logger.info(
+            f"Phase {phase}: {(timestamp - previous) * 1000:.1f}ms "
+            f"(at {(timestamp - start_time) * 1000:.1f}ms)"
+        )
+        previous = timestamp
+
+    slowest = sorted(import_times.items(), key=lambda item: item[1], reverse=True)
+    for name, duration in slowest[:REPORTED_IMPORTS]:
+        logger.info(f"Import {name}: {duration * 1000:.1f}ms")
+
+
+if os.environ.get(ENVIRONMENT_VARIABLE) or COMMAND_LINE_FLAG in sys.argv:
+    enable()
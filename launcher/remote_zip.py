@@ -0,0 +1,282 @@
+import logging
+import os
+import pathlib
+import struct
+import zipfile
+import zlib
+
+import requests
+
+from launcher import download, verify
+from launcher.config import Config
+
+logging.basicConfig(
+    filename="launcher.log",
+    filemode="a",
+    format="%(asctime)s,%(msecs)d %(name)s %(levelname)s %(message)s",
+    datefmt="%H:%M:%S",
+    level=logging.INFO,
+)
+
+logger = logging.getLogger("Remote Zip")
+
+CHUNK_SIZE = 1024 * 1024
+
+END_OF_CENTRAL_DIRECTORY = struct.Struct("<4s4H2LH")
+ZIP64_END_OF_CENTRAL_DIRECTORY_LOCATOR = struct.Struct("<4sLQL")
+ZIP64_END_OF_CENTRAL_DIRECTORY = struct.Struct("<4sQ2H2L4Q")
+CENTRAL_DIRECTORY_ENTRY = struct.Struct("<4s4B4HL2L5H2L")
+LOCAL_FILE_HEADER = struct.Struct("<4s2B4HL2L2H")
+
+# The end of central directory record may be followed by a comment of up to
+# 64 KiB
+MAX_END_OF_CENTRAL_DIRECTORY_SIZE = END_OF_CENTRAL_DIRECTORY.size + 0xFFFF
+
+
+class RemoteZipError(Exception):
+    pass
+
+
+class RemoteZip:
+    """
+    Random access to a zip archive on a server that supports Range requests.
+
+    Only the end of central directory and the central directory are fetched
+    when the archive is opened. Members are streamed individually from their
+    byte range through the decompressor.
+    """
+
+    def __init__(self, url, session=None):
+        self.url = url
+        self.session = session or requests.Session()
+        self.size = download.fetch_size(url)
+        self.members = self.read_central_directory()
+
+    def fetch(self, start, end):
+        """Returns the bytes start..end (inclusive) of the archive."""
+        # Streamed, so a server ignoring the Range header does not send the
+        # whole archive before the status is checked
+        with self.session.get(
+            self.url,
+            headers={"Range": f"bytes={start}-{end}"},
+            stream=True,
+            timeout=Config.REQUEST_TIMEOUT,
+        ) as response:
+            response.raise_for_status()
+            if response.status_code != 206:
+                raise RemoteZipError(f"{self.url} does not support range requests.")
+            return response.content
+
+    def read_central_directory(self):
+        tail_start = max(0, self.size - MAX_END_OF_CENTRAL_DIRECTORY_SIZE)
+        tail = self.fetch(tail_start, self.size - 1)
+        eocd_position = tail.rfind(b"PK\x05\x06")
+        if eocd_position < 0:
+            raise RemoteZipError(f"{self.url} is not a zip file.")
+        (
+            _,
+            _,
+            _,
+            _,
+            entries,
+            cd_size,
+            cd_offset,
+            _,
+        ) = END_OF_CENTRAL_DIRECTORY.unpack_from(tail, eocd_position)
+
+        locator_position = eocd_position - ZIP64_END_OF_CENTRAL_DIRECTORY_LOCATOR.size
+        if (
+            locator_position >= 0
+            and tail[locator_position : locator_position + 4] == b"PK\x06\x07"
+        ):
+            (
+                _,
+                _,
+                zip64_eocd_offset,
+                _,
+            ) = ZIP64_END_OF_CENTRAL_DIRECTORY_LOCATOR.unpack_from(
+                tail, locator_position
+            )
+            zip64_eocd = self.read(
+                tail, tail_start, zip64_eocd_offset, ZIP64_END_OF_CENTRAL_DIRECTORY.size
+            )
+            (
+                signature,
+                *_,
+                entries,
+                cd_size,
+                cd_offset,
+            ) = ZIP64_END_OF_CENTRAL_DIRECTORY.unpack(zip64_eocd)
+            if signature != b"PK\x06\x06":
+                raise RemoteZipError(f"{self.url} has a corrupt zip64 record.")
+
+        central_directory = self.read(tail, tail_start, cd_offset, cd_size)
+        logger.info(
+            f"Read central directory of {self.url}: {entries} entries, "
+            f"{cd_size} bytes"
+        )
+        return parse_central_directory(central_directory, entries)
+
+    def read(self, tail, tail_start, offset, size):
+        # Serves the bytes from the already fetched tail where possible
+        if offset >= tail_start:
+            return tail[offset - tail_start : offset - tail_start + size]
+        return self.fetch(offset, offset + size - 1)
+
+    def infolist(self):
+        return self.members
+
+    def iter_member(self, info):
+        """Yields the decompressed content of a member in chunks."""
+        if info.compress_type == zipfile.ZIP_STORED:
+            decompressor = None
+        elif info.compress_type == zipfile.ZIP_DEFLATED:
+            decompressor = zlib.decompressobj(-zlib.MAX_WBITS)
+        else:
+            raise RemoteZipError(
+                f"Compression method {info.compress_type} of {info.filename} "
+                "is not supported."
+            )
+
+        # The local header repeats the name and may have a different extra
+        # field, so the range includes room for the largest possible one.
+        start = info.header_offset
+        end = min(
+            start + LOCAL_FILE_HEADER.size + 2 * 0xFFFF + info.compress_size - 1,
+            self.size - 1,
+        )
+        with self.session.get(
+            self.url,
+            headers={"Range": f"bytes={start}-{end}"},
+            stream=True,
+            timeout=Config.REQUEST_TIMEOUT,
+        ) as response:
+            response.raise_for_status()
+            if response.status_code != 206:
+                raise RemoteZipError(f"{self.url} does not support range requests.")
+            raw = response.raw
+            header = raw.read(LOCAL_FILE_HEADER.size)
+            fields = LOCAL_FILE_HEADER.unpack(header)
+            if fields[0] != b"PK\x03\x04":
+                raise RemoteZipError(f"{info.filename} has a corrupt local header.")
+            raw.read(fields[-2] + fields[-1])
+
+            crc = 0
+            remaining = info.compress_size
+            while remaining > 0:
+                chunk = raw.read(min(CHUNK_SIZE, remaining))
+                if not chunk:
+                    raise RemoteZipError(f"{info.filename} ended prematurely.")
+                remaining -= len(chunk)
+                if decompressor is not None:
+                    chunk = decompressor.decompress(chunk)
+                crc = zlib.crc32(chunk, crc)
+                yield chunk
+            if decompressor is not None:
+                chunk = decompressor.flush()
+                crc = zlib.crc32(chunk, crc)
+                yield chunk
+
+        if crc != info.CRC:
+            raise RemoteZipError(f"CRC mismatch for {info.filename}.")
+
+    def extract(self, info, dest_path):
+        """Streams a single member into dest_path."""
+        dest_path = pathlib.Path(dest_path)
+        temp_dest_path = pathlib.Path(f"{dest_path}.part")
+        temp_dest_path.parent.mkdir(parents=True, exist_ok=True)
+        with open(temp_dest_path, "wb") as file:
+            for chunk in self.iter_member(info):
+                file.write(chunk)
+        os.replace(temp_dest_path, dest_path)
+
+
+def parse_central_directory(data, entries):
+    members = []
+    position = 0
+    for _ in range(entries):
+        (
+            signature,
+            _,
+            _,
+            _,
+            _,
+            flags,
+            compress_type,
+            _,
+            _,
+            crc,
+            compress_size,
+            file_size,
+            name_length,
+            extra_length,
+            comment_length,
+            _,
+            _,
+            _,
+            header_offset,
+        ) = CENTRAL_DIRECTORY_ENTRY.unpack_from(data, position)
+        if signature != b"PK\x01\x02":
+            raise RemoteZipError("Corrupt central directory.")
+        position += CENTRAL_DIRECTORY_ENTRY.size
+        name = data[position : position + name_length]
+        position += name_length
+        extra = data[position : position + extra_length]
+        position += extra_length + comment_length
+
+        info = zipfile.ZipInfo(name.decode("utf-8" if flags & 0x800 else "cp437"))
+        info.flag_bits = flags
+        info.compress_type = compress_type
+        info.CRC = crc
+        info.compress_size = compress_size
+        info.file_size = file_size
+        info.header_offset = header_offset
+        read_zip64_extra(info, extra)
+        members.append(info)
+    return members
+
+
+def read_zip64_extra(info, extra):
+    # The zip64 extra field holds the 64-bit values of exactly those fields
+    # that are set to 0xFFFFFFFF in the central directory entry
+    position = 0
+    while position + 4 <= len(extra):
+        header_id, size = struct.unpack_from("<HH", extra, position)
+        position += 4
+        if header_id == 0x0001:
+            values = iter(struct.unpack_from(f"<{size // 8}Q", extra, position))
+            if info.file_size == 0xFFFFFFFF:
+                info.file_size = next(values)
+            if info.compress_size == 0xFFFFFFFF:
+                info.compress_size = next(values)
+            if info.header_offset == 0xFFFFFFFF:
+                info.header_offset = next(values)
+            return
+        position += size
+
+
+def extract_client_files(install_folder, url=None, files=None, progress=None):
+    """
+    Installs single client files straight from the remote client zip.
+
+    Args:
+    install_folder (pathlib.Path): The WoW installation folder.
+    url (str): The URL of the client zip. Defaults to Config.LINKS.
+    files (list): Paths relative to the installation folder. Defaults to all
+    client files except the ones the launcher removes or replaces.
+    progress (callable): Called with (done, total, message) before each file.
+
+    Returns:
+    list: The files that were extracted.
+    """
+    install_folder = pathlib.Path(install_folder)
+    remote_zip = RemoteZip(url or Config.LINKS["wow-client.zip"])
+    members = verify.client_members(remote_zip.infolist())
+    files = list(members) if files is None else files
+    progress = progress or (lambda done, total, message: None)
+
+    for done, file in enumerate(files):
+        progress(done, len(files), f"Fetching {file}")
+        logger.info(f"Fetching {file} from the remote client zip")
+        remote_zip.extract(members[file], install_folder / file)
+    return files
@@ -0,0 +1,306 @@
+import logging
+import mmap
+import os
+import pathlib
+import shutil
+import zipfile
+from concurrent.futures import ThreadPoolExecutor
+
+import requests
+
+from launcher import download, remote_zip, verify
+from launcher.config import Config
+
+logging.basicConfig(
+    filename="launcher.log",
+    filemode="a",
+    format="%(asctime)s,%(msecs)d %(name)s %(levelname)s %(message)s",
+    datefmt="%H:%M:%S",
+    level=logging.INFO,
+)
+
+logger = logging.getLogger("Repair")
+
+CHUNK_SIZE = 1024 * 1024
+
+
+def custom_files():
+    return [file for file in Config.LINKS if file != "wow-client.zip"]
+
+
+def restorable_files(install_folder, manifest=None):
+    """
+    Lists the files repair_install knows a source for without asking the
+    server: the manifest entries, the members of the local client zip, the
+    archives every client has and the custom files.
+
+    Returns:
+    dict: Maps the lowercase paths, relative to the installation folder, to
+    the paths as repair_install knows them.
+    """
+    zip_path = pathlib.Path(install_folder) / "wow-client.zip"
+    files = list(Config.CLIENT_ARCHIVES) + custom_files()
+    if manifest is not None:
+        files += list(manifest["files"])
+    if zip_path.exists():
+        try:
+            files += list(verify.client_zip_members(zip_path))
+        except (OSError, zipfile.BadZipFile) as e:
+            logger.warning(f"Reading {zip_path} failed: {e}")
+    return {file.lower(): file for file in files}
+
+
+def find_damaged_files(install_folder, manifest=None, index=None, client_zip=None):
+    """
+    Finds the damaged files of an installation.
+
+    Client files are checked against the manifest, or against the CRC32 of the
+    local client zip if there is no manifest, or against the central directory
+    of the remote client zip if there is neither. Custom files missing from the
+    manifest are compared to the size the server reports for them.
+
+    Returns:
+    dict: Maps relative paths to the reason the file is damaged.
+    """
+    install_folder = pathlib.Path(install_folder)
+    index = index if index is not None else verify.HashIndex()
+    zip_path = install_folder / "wow-client.zip"
+
+    damaged = {}
+    if manifest is not None:
+        damaged.update(verify.verify_install(install_folder, manifest, index))
+    elif zip_path.exists():
+        damaged.update(verify.verify_against_zip(install_folder, zip_path, index))
+    elif client_zip is not None:
+        members = verify.client_members(client_zip.infolist())
+        zip_manifest = verify.members_manifest(members)
+        damaged.update(verify.verify_install(install_folder, zip_manifest, index))
+
+    checked_files = manifest["files"] if manifest is not None else {}
+    for file in custom_files():
+        if file in checked_files:
+            continue
+        dest_path = install_folder / file
+        if not dest_path.exists():
+            damaged[file] = "missing"
+        elif dest_path.stat().st_size != download.fetch_size(Config.LINKS[file]):
+            damaged[file] = "size"
+    return damaged
+
+
+def find_damaged_blocks(path, expected, algorithm):
+    """
+    Hashes the blocks of a local file in parallel and compares them to the
+    block digests of its manifest entry.
+
+    Returns:
+    list: The indices of all blocks that are damaged or missing.
+    """
+    block_size = expected["block_size"]
+    size = path.stat().st_size if path.exists() else 0
+    if size == 0:
+        return list(range(len(expected["blocks"])))
+
+    with open(path, "rb") as file, mmap.mmap(
+        file.fileno(), 0, access=mmap.ACCESS_READ
+    ) as mapped:
+        view = memoryview(mapped)
+
+        def block_ok(block):
+            start = block * block_size
+            end = min(start + block_size, expected["size"])
+            if end > size:
+                return False
+            digest = verify.hash_bytes(view[start:end], algorithm)
+            return digest == expected["blocks"][block]
+
+        try:
+            with ThreadPoolExecutor() as executor:
+                blocks_ok = list(executor.map(block_ok, range(len(expected["blocks"]))))
+        finally:
+            view.release()
+
+    return [block for block, ok in enumerate(blocks_ok) if not ok]
+
+
+def coalesce_blocks(blocks, block_size, total_size):
+    """Merges adjacent block indices into inclusive (start, end) byte ranges."""
+    ranges = []
+    for block in blocks:
+        start = block * block_size
+        end = min(start + block_size, total_size) - 1
+        if ranges and ranges[-1][1] + 1 == start:
+            ranges[-1] = (ranges[-1][0], end)
+        else:
+            ranges.append((start, end))
+    return ranges
+
+
+def fetch_range(url, dest_path, start, end=None):
+    """
+    Writes the bytes start..end of url at the same offset into dest_path.
+
+    Raises:
+    requests.HTTPError: If the server does not honor the Range request.
+    """
+    range_header = f"bytes={start}-" if end is None else f"bytes={start}-{end}"
+    with requests.get(
+        url,
+        headers={"Range": range_header},
+        stream=True,
+        timeout=Config.REQUEST_TIMEOUT,
+    ) as response:
+        response.raise_for_status()
+        if response.status_code != 206:
+            raise requests.HTTPError(f"{url} does not support range requests.")
+        with open(dest_path, "r+b") as file:
+            file.seek(start)
+            for chunk in response.iter_content(chunk_size=CHUNK_SIZE):
+                file.write(chunk)
+
+
+def download_whole_file(url, dest_path):
+    temp_dest_path = pathlib.Path(f"{dest_path}.part")
+    temp_dest_path.parent.mkdir(parents=True, exist_ok=True)
+    with requests.get(url, stream=True, timeout=Config.REQUEST_TIMEOUT) as response:
+        response.raise_for_status()
+        with open(temp_dest_path, "wb") as file:
+            shutil.copyfileobj(response.raw, file, CHUNK_SIZE)
+    os.replace(temp_dest_path, dest_path)
+
+
+def repair_blocks(url, dest_path, expected, algorithm):
+    """Re-fetches only the damaged blocks of a file with Range requests."""
+    blocks = find_damaged_blocks(dest_path, expected, algorithm)
+    logger.info(
+        f"{dest_path}: {len(blocks)} of {len(expected['blocks'])} blocks damaged"
+    )
+
+    dest_path.parent.mkdir(parents=True, exist_ok=True)
+    with open(dest_path, "ab") as file:
+        file.truncate(expected["size"])
+
+    for start, end in coalesce_blocks(blocks, expected["block_size"], expected["size"]):
+        logger.info(f"Fetching bytes {start}-{end} of {dest_path}")
+        fetch_range(url, dest_path, start, end)
+
+
+def repair_file(url, dest_path, expected=None, algorithm=verify.HASH_ALGORITHM):
+    """
+    Repairs a single file from url.
+
+    Files with block digests in their manifest entry are repaired block-wise.
+    Truncated files are resumed from their current size. Everything else, and
+    every repair that does not result in the expected digest, is downloaded as
+    a whole.
+
+    Returns:
+    bool: Whether the file matches the manifest after the repair. Always True
+    for files without a manifest entry.
+    """
+    dest_path = pathlib.Path(dest_path)
+    expected = expected or {}
+
+    def matches():
+        if "digest" not in expected:
+            return True
+        return verify.hash_file(dest_path, algorithm) == expected["digest"]
+
+    try:
+        if "blocks" in expected:
+            repair_blocks(url, dest_path, expected, algorithm)
+            if matches():
+                return True
+        else:
+            size = dest_path.stat().st_size if dest_path.exists() else 0
+            total_size = expected.get("size") or download.fetch_size(url)
+            if 0 < size < total_size:
+                logger.info(f"Resuming truncated {dest_path} at byte {size}")
+                fetch_range(url, dest_path, size)
+                if matches():
+                    return True
+    except requests.RequestException as e:
+        logger.warning(f"Partial repair of {dest_path} failed: {e}")
+
+    logger.info(f"Downloading {dest_path} as a whole")
+    download_whole_file(url, dest_path)
+    return matches()
+
+
+def repair_install(install_folder, manifest=None, progress=None, damaged_files=()):
+    """
+    Finds the damaged files of an installation and repairs only those.
+
+    Client files are re-extracted from the local client zip when it exists,
+    fetched from the URL in the manifest otherwise, and streamed from their
+    byte range in the remote client zip as a last resort. Custom files are
+    fetched from Config.LINKS.
+
+    Args:
+    install_folder (pathlib.Path): The WoW installation folder.
+    manifest (dict): Optional manifest as returned by verify.load_manifest.
+    progress (callable): Called with (done, total, message) after each step.
+    damaged_files (collection): Files already known to be damaged, e.g. by
+    mpq.check_archives, which are repaired even if they pass the check.
+
+    Returns:
+    dict: Maps every damaged file to True if it was repaired.
+    """
+    install_folder = pathlib.Path(install_folder)
+    progress = progress or (lambda done, total, message: None)
+    index = verify.HashIndex()
+    zip_path = install_folder / "wow-client.zip"
+    algorithm = (manifest or {}).get("algorithm", verify.HASH_ALGORITHM)
+    verify.check_algorithm(algorithm)
+    expected_files = (manifest or {}).get("files", {})
+
+    client_zip = None
+    remote_members = {}
+
+    def get_remote_members():
+        nonlocal client_zip, remote_members
+        if client_zip is None:
+            client_zip = remote_zip.RemoteZip(Config.LINKS["wow-client.zip"])
+            remote_members = verify.client_members(client_zip.infolist())
+        return remote_members
+
+    progress(0, 1, "Checking files")
+    if manifest is None and not zip_path.exists():
+        get_remote_members()
+    damaged = find_damaged_files(install_folder, manifest, index, client_zip)
+    for file in damaged_files:
+        damaged.setdefault(file, "damaged archive")
+    logger.info(f"Found {len(damaged)} damaged files")
+
+    zip_members = verify.client_zip_members(zip_path) if zip_path.exists() else {}
+
+    results = {}
+    for done, file in enumerate(sorted(damaged)):
+        progress(done, len(damaged), f"Repairing {file}")
+        expected = expected_files.get(file, {})
+        url = expected.get("url") or Config.LINKS.get(file)
+        try:
+            if file in zip_members:
+                verify.extract_client_files(install_folder, zip_path, [file])
+                results[file] = True
+            elif url is not None:
+                results[file] = repair_file(
+                    url, install_folder / file, expected, algorithm
+                )
+            elif file in get_remote_members():
+                client_zip.extract(remote_members[file], install_folder / file)
+                results[file] = True
+            else:
+                logger.warning(f"No source to repair {file} from")
+                results[file] = False
+        except (
+            OSError,
+            requests.RequestException,
+            remote_zip.RemoteZipError,
+        ) as e:
+            logger.error(f"Repairing {file} failed: {e}")
+            results[file] = False
+
+    index.save()
+    progress(len(damaged), len(damaged), "Repair finished")
+    return results
@@ -0,0 +1,140 @@
+import logging
+import time
+
+from PySide6.QtCore import QEvent, QObject, QTimer
+
+logging.basicConfig(
+    filename="launcher.log",
+    filemode="a",
+    format="%(asctime)s,%(msecs)d %(name)s %(levelname)s %(message)s",
+    datefmt="%H:%M:%S",
+    level=logging.INFO,
+)
+
+logger = logging.getLogger("Scheduler")
+
+# Factor by which the interval of an adaptive job grows while it is stable
+STABLE_FACTOR = 2
+# Jobs due within this fraction of their interval run early, since coarse
+# timers may fire up to 5% early
+EARLY_FRACTION = 0.05
+
+
+class Job:
+    def __init__(self, callback, interval, min_interval, max_interval, suspendable):
+        self.callback = callback
+        self.interval = interval
+        self.min_interval = interval if min_interval is None else min_interval
+        self.max_interval = interval if max_interval is None else max_interval
+        self.suspendable = suspendable
+        self.last_run = None
+        self.due = time.monotonic() + interval
+
+
+class Scheduler(QObject):
+    """
+    Runs all periodic work of the launcher on the GUI thread from a single
+    timer, which only wakes up when the next job is due.
+
+    Jobs with a min_interval and max_interval are adaptive: after report()
+    tells that their state changed they run at min_interval, and the
+    interval grows up to max_interval while it stays the same. Suspendable
+    jobs do not run while any reason to suspend is set, e.g. while the watched
+    window is hidden or the game is running. Without active jobs the timer is
+    stopped entirely.
+    """
+
+    def __init__(self, parent=None):
+        super().__init__(parent)
+        self.jobs = {}
+        self.suspend_reasons = set()
+        self.timer = QTimer(self)
+        self.timer.setSingleShot(True)
+        self.timer.timeout.connect(self.run_due_jobs)
+
+    def add(
+        self,
+        name,
+        callback,
+        interval,
+        min_interval=None,
+        max_interval=None,
+        suspendable=True,
+        run_now=False,
+    ):
+        """
+        Adds a job that calls callback every interval seconds, replacing a job
+        with the same name.
+        """
+        job = Job(callback, interval, min_interval, max_interval, suspendable)
+        self.jobs[name] = job
+        if run_now:
+            job.due = time.monotonic()
+        self.reschedule()
+
+    def remove(self, name):
+        if self.jobs.pop(name, None) is not None:
+            self.reschedule()
+
+    def report(self, name, changed):
+        """Adapts the interval of a job to whether its state just changed."""
+        job = self.jobs.get(name)
+        if job is None:
+            return
+        if changed:
+            job.interval = job.min_interval
+        else:
+            job.interval = min(job.interval * STABLE_FACTOR, job.max_interval)
+        job.due = (job.last_run or time.monotonic()) + job.interval
+        self.reschedule()
+
+    def suspend(self, reason):
+        self.suspend_reasons.add(reason)
+        self.reschedule()
+
+    def resume(self, reason):
+        self.suspend_reasons.discard(reason)
+        self.reschedule()
+
+    def active_jobs(self):
+        return {
+            name: job
+            for name, job in self.jobs.items()
+            if not (job.suspendable and self.suspend_reasons)
+        }
+
+    def reschedule(self):
+        jobs = self.active_jobs()
+        if not jobs:
+            self.timer.stop()
+            return
+        delay = min(job.due for job in jobs.values()) - time.monotonic()
+        self.timer.start(max(0, int(delay * 1000)))
+
+    def run_due_jobs(self):
+        now = time.monotonic()
+        for name, job in self.active_jobs().items():
+            # A callback may have removed or replaced a later job
+            if self.jobs.get(name) is not job:
+                continue
+            if job.due - now <= job.interval * EARLY_FRACTION:
+                job.last_run = now
+                job.due = now + job.interval
+                try:
+                    job.callback()
+                except Exception:
+                    # Otherwise the timer is never started again
+                    logger.exception(f"Scheduled job {name} failed")
+        self.reschedule()
+
+    def watch(self, window):
+        """Suspends jobs while window is hidden or minimized."""
+        window.installEventFilter(self)
+
+    def eventFilter(self, watched, event):
+        if event.type() in (QEvent.Hide, QEvent.Show, QEvent.WindowStateChange):
+            if watched.isHidden() or watched.isMinimized():
+                self.suspend("hidden")
+            else:
+                self.resume("hidden")
+        return False
@@ -0,0 +1,116 @@
+import logging
+import pathlib
+import shutil
+
+import requests
+
+from launcher import bsdiff, http, verify
+from launcher.config import Config
+
+logging.basicConfig(
+    filename="launcher.log",
+    filemode="a",
+    format="%(asctime)s,%(msecs)d %(name)s %(levelname)s %(message)s",
+    datefmt="%H:%M:%S",
+    level=logging.INFO,
+)
+
+logger = logging.getLogger("Self Update")
+
+# A release may contain a patch from every previous version to its launcher,
+# named after the full asset and the version it applies to, e.g.
+# duskhaven_launcher.exe.v1.2.0.bsdiff
+PATCH_SUFFIX = ".bsdiff"
+# Sidecar assets holding the SHA-256 of an asset, in sha256sum format
+DIGEST_SUFFIX = ".sha256"
+
+
+class UpdateError(Exception):
+    pass
+
+
+def find_patch_asset(assets, asset, current_version):
+    """Returns the patch from current_version to asset, if the release has one."""
+    name = f"{asset['name']}.{current_version}{PATCH_SUFFIX}"
+    for patch_asset in assets:
+        if patch_asset["name"] == name:
+            return patch_asset
+    return None
+
+
+def expected_digest(asset, assets):
+    """
+    Returns the SHA-256 of an asset as published by GitHub, or from a sidecar
+    asset, or None if the release has neither.
+    """
+    digest = asset.get("digest") or ""
+    if digest.startswith("sha256:"):
+        return digest.split(":", 1)[1].lower()
+
+    for digest_asset in assets:
+        if digest_asset["name"] == asset["name"] + DIGEST_SUFFIX:
+            response = http.session.get(
+                digest_asset["browser_download_url"], timeout=Config.REQUEST_TIMEOUT
+            )
+            response.raise_for_status()
+            return response.text.split()[0].lower()
+    return None
+
+
+def verify_update(path, digest):
+    """
+    Raises:
+    UpdateError: If the file at path does not have the expected digest.
+    """
+    actual = verify.hash_file(path, "sha256")
+    if actual != digest:
+        raise UpdateError(f"{path} has digest {actual}, expected {digest}")
+
+
+def prepare_update(download_path, asset, assets, executable_path=None):
+    """
+    Turns a downloaded launcher update into the new launcher binary.
+
+    Args:
+    download_path (pathlib.Path): The downloaded asset or patch.
+    asset (dict): The full launcher asset of the release.
+    assets (list): All assets of the release.
+    executable_path (pathlib.Path): The running launcher. If given,
+    download_path is a patch that is applied to it.
+
+    Returns:
+    pathlib.Path: The verified new launcher binary.
+
+    Raises:
+    UpdateError: If the patch cannot be applied or the result does not match
+    the published digest. Patched binaries are never used unverified.
+    """
+    download_path = pathlib.Path(download_path)
+    try:
+        digest = expected_digest(asset, assets)
+    except requests.RequestException as e:
+        raise UpdateError(f"Fetching the digest of {asset['name']} failed: {e}")
+
+    if executable_path is None:
+        new_path = download_path
+    else:
+        if digest is None:
+            raise UpdateError(f"No digest published for {asset['name']}")
+        new_path = download_path.with_name(asset["name"] + ".new")
+        try:
+            bsdiff.apply_patch(executable_path, download_path, new_path)
+        except (OSError, bsdiff.PatchError) as e:
+            raise UpdateError(f"Applying {download_path} failed: {e}")
+        finally:
+            download_path.unlink(missing_ok=True)
+        shutil.copymode(executable_path, new_path)
+        logger.info(f"Patched {executable_path} to {new_path}")
+
+    if digest is not None:
+        try:
+            verify_update(new_path, digest)
+        except UpdateError:
+            new_path.unlink(missing_ok=True)
+            raise
+        logger.info(f"Verified {new_path}")
+    return new_path
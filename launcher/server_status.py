@@ -1,28 +1,293 @@
-import socket
+import asyncio
+import math
+import struct
 import time
+from array import array
 
+# Consecutive samples that must agree before a known status changes
+CONFIRMATION_SAMPLES = 2
+# Samples kept per server, an hour even at the status bar's shortest interval
+# of 5 seconds, so the longest of SUMMARY_WINDOWS is always fully covered
+HISTORY_SIZE = 720
+# Windows in seconds over which latency and uptime are summarized
+SUMMARY_WINDOWS = (300, 3600)
 
-def check(host, port, timeout=2):
-    sock = socket.socket(socket.AF_INET, socket.SOCK_STREAM)  # presumably
-    sock.settimeout(timeout)
+AUTH_LOGON_CHALLENGE = 0x00
+# Account name sent by the handshake probe, the server rejects or fakes it
+PROBE_ACCOUNT = "STATUSPROBE"
+
+
+def logon_challenge(account=PROBE_ACCOUNT):
+    """
+    Returns:
+    bytes: An AUTH_LOGON_CHALLENGE as sent by a 3.3.5a (12340) client.
+    """
+    account = account.upper().encode("ascii")
+    body = struct.pack(
+        "<4s3BH4s4s4sIIB",
+        b"WoW\0",
+        3,
+        3,
+        5,
+        12340,
+        b"68x\0",  # "x86", the strings below are sent reversed
+        b"niW\0",
+        b"SUne",
+        0,
+        0,
+        len(account),
+    )
+    body += account
+    return struct.pack("<BBH", AUTH_LOGON_CHALLENGE, 8, len(body)) + body
+
+
+async def probe(host, port, timeout=2):
+    """
+    Returns:
+    float: Seconds it took to open a TCP connection, or None if it failed.
+    """
+    start = time.perf_counter()
+    try:
+        _, writer = await asyncio.wait_for(asyncio.open_connection(host, port), timeout)
+    except (OSError, asyncio.TimeoutError):
+        return None
+    rtt = time.perf_counter() - start
+    writer.close()
+    try:
+        await writer.wait_closed()
+    except OSError:
+        pass
+    return rtt
+
+
+async def probe_handshake(host, port, timeout=2):
+    """
+    Sends a logon challenge and waits for the start of the answer, so a
+    server that accepts connections but does not answer counts as down.
+
+    Returns:
+    tuple: Seconds it took to open the TCP connection, or None if it failed,
+    and seconds from sending the challenge to the answer, or None if no valid
+    answer arrived within timeout.
+    """
+    start = time.perf_counter()
+    try:
+        reader, writer = await asyncio.wait_for(
+            asyncio.open_connection(host, port), timeout
+        )
+    except (OSError, asyncio.TimeoutError):
+        return None, None
+    rtt = time.perf_counter() - start
+    handshake_rtt = None
     try:
-        sock.connect((host, port))
-    except:  # noqa: E722
-        return False
-    else:
-        sock.close()
-        return True
-
-
-def check_login_server():
-    if not check("51.75.147.219", 3724, timeout=2):
-        return False
-    time.sleep(5)
-    return check("51.75.147.219", 3724, timeout=2)
-
-
-def check_game_server():
-    if not check("51.75.147.219", 8086, timeout=2):
-        return False
-    time.sleep(5)
-    return check("51.75.147.219", 8086, timeout=2)
+        start = time.perf_counter()
+        writer.write(logon_challenge())
+        await writer.drain()
+        answer = await asyncio.wait_for(reader.readexactly(2), timeout)
+        # Any result, including an unknown account, shows the server is working
+        if answer[0] == AUTH_LOGON_CHALLENGE:
+            handshake_rtt = time.perf_counter() - start
+    except (OSError, asyncio.TimeoutError, asyncio.IncompleteReadError):
+        pass
+    finally:
+        writer.close()
+        try:
+            await writer.wait_closed()
+        except OSError:
+            pass
+    return rtt, handshake_rtt
+
+
+async def probe_all(targets, timeout=2, handshake_targets=()):
+    """
+    Probes all targets concurrently.
+
+    Args:
+    targets (dict): Maps names to (host, port) tuples.
+    handshake_targets (collection): Names of authservers that are probed
+    with a logon challenge.
+
+    Returns:
+    dict: Maps names to the connect RTT in seconds, or None if unreachable,
+    and the logon challenge RTT, which is None if it failed or was not sent.
+    """
+
+    async def probe_target(name):
+        if name in handshake_targets:
+            return await probe_handshake(*targets[name], timeout=timeout)
+        return await probe(*targets[name], timeout=timeout), None
+
+    names = list(targets)
+    results = await asyncio.gather(*(probe_target(name) for name in names))
+    return dict(zip(names, results))
+
+
+class LatencyHistory:
+    """
+    Fixed-size ring buffer of timestamped RTT samples.
+
+    Times and RTTs are kept in two preallocated arrays of doubles, failed
+    probes are stored as NaN. Once full, each sample overwrites the oldest.
+    """
+
+    def __init__(self, capacity=HISTORY_SIZE):
+        self.capacity = capacity
+        self.times = array("d", [0.0]) * capacity
+        self.rtts = array("d", [0.0]) * capacity
+        self.start = 0
+        self.count = 0
+
+    def __len__(self):
+        return self.count
+
+    def add(self, timestamp, rtt):
+        index = (self.start + self.count) % self.capacity
+        if self.count == self.capacity:
+            self.start = (self.start + 1) % self.capacity
+        else:
+            self.count += 1
+        self.times[index] = timestamp
+        self.rtts[index] = math.nan if rtt is None else rtt
+
+    def samples(self, window=None, now=None):
+        """
+        Args:
+        window (float): Only samples from the last window seconds, if given.
+        now (float): The time the window ends at, defaults to time.time().
+
+        Returns:
+        list: (timestamp, rtt) tuples, oldest first. rtt is None for failed
+        probes.
+        """
+        oldest = -math.inf
+        if window is not None:
+            oldest = (time.time() if now is None else now) - window
+        samples = []
+        for offset in range(self.count):
+            index = (self.start + offset) % self.capacity
+            if self.times[index] >= oldest:
+                rtt = self.rtts[index]
+                samples.append((self.times[index], None if math.isnan(rtt) else rtt))
+        return samples
+
+    def percentile(self, percentile, window=None, now=None):
+        """
+        Returns:
+        float: The nearest-rank percentile of the successful RTTs, or None if
+        there are none.
+        """
+        rtts = sorted(rtt for _, rtt in self.samples(window, now) if rtt is not None)
+        if not rtts:
+            return None
+        rank = math.ceil(percentile / 100 * len(rtts))
+        return rtts[min(max(rank, 1), len(rtts)) - 1]
+
+    def uptime(self, window=None, now=None):
+        """
+        Returns:
+        float: The fraction of successful probes, or None without samples.
+        """
+        samples = self.samples(window, now)
+        if not samples:
+            return None
+        return sum(rtt is not None for _, rtt in samples) / len(samples)
+
+
+class ServerStatus:
+    """
+    Debounced status of a server. A single failed or successful probe does
+    not flip a known status, CONFIRMATION_SAMPLES consecutive ones do.
+    """
+
+    def __init__(self, confirmation_samples=CONFIRMATION_SAMPLES, handshake=False):
+        self.confirmation_samples = confirmation_samples
+        self.online = None
+        self.rtt = None
+        self.streak = 0
+        self.history = LatencyHistory()
+        # With a handshake probe the server is only online if it answers
+        self.handshake = handshake
+        self.handshake_rtt = None
+        self.handshake_history = LatencyHistory() if handshake else None
+
+    def add_sample(self, rtt, timestamp=None, handshake_rtt=None):
+        """
+        Returns:
+        bool: The status after the sample.
+        """
+        timestamp = time.time() if timestamp is None else timestamp
+        self.history.add(timestamp, rtt)
+        if rtt is not None:
+            self.rtt = rtt
+        if self.handshake:
+            self.handshake_history.add(timestamp, handshake_rtt)
+            if handshake_rtt is not None:
+                self.handshake_rtt = handshake_rtt
+            online = handshake_rtt is not None
+        else:
+            online = rtt is not None
+        if self.online is None or online == self.online:
+            self.online = online
+            self.streak = 0
+        else:
+            self.streak += 1
+            if self.streak >= self.confirmation_samples:
+                self.online = online
+                self.streak = 0
+        return self.online
+
+    def summary(self, now=None):
+        """
+        Returns a copy of the history that is safe to pass to another thread.
+
+        Returns:
+        dict: "rtts" holds the RTTs of all kept samples, oldest first.
+        "windows" maps each of SUMMARY_WINDOWS to its median RTT, 95th
+        percentile RTT and uptime. With a handshake probe "handshake_windows"
+        holds the same for the logon challenge RTTs.
+        """
+        now = time.time() if now is None else now
+        summary = {
+            "rtts": [rtt for _, rtt in self.history.samples()],
+            "windows": summarize(self.history, now),
+        }
+        if self.handshake:
+            summary["handshake_windows"] = summarize(self.handshake_history, now)
+        return summary
+
+
+def summarize(history, now):
+    return {
+        window: (
+            history.percentile(50, window, now),
+            history.percentile(95, window, now),
+            history.uptime(window, now),
+        )
+        for window in SUMMARY_WINDOWS
+    }
+
+
+class ServerMonitor:
+    def __init__(self, targets, timeout=2, handshake_targets=()):
+        self.targets = targets
+        self.timeout = timeout
+        self.handshake_targets = frozenset(handshake_targets)
+        self.statuses = {
+            name: ServerStatus(handshake=name in self.handshake_targets)
+            for name in targets
+        }
+
+    def sample(self):
+        """
+        Probes all targets once and updates their statuses.
+
+        Returns:
+        dict: Maps names to their ServerStatus.
+        """
+        timestamp = time.time()
+        results = asyncio.run(
+            probe_all(self.targets, self.timeout, self.handshake_targets)
+        )
+        for name, (rtt, handshake_rtt) in results.items():
+            self.statuses[name].add_sample(rtt, timestamp, handshake_rtt)
+        return self.statuses
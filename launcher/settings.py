@@ -1,43 +1,153 @@
+import atexit
 import json
+import os
+import threading
 from pathlib import Path
 
+# Seconds to wait for further changes before writing them to disk
+SAVE_DELAY = 0.5
+
 
 class Settings:
-    def __init__(self, filename):
+    """
+    Thread-safe configuration store backed by a JSON file.
+
+    Every change replaces the whole dictionary (copy-on-write), so readers on
+    any thread get a consistent snapshot without locking. The copy is
+    shallow, so lists and dicts must be replaced by changed copies, never
+    modified in place. save() only schedules a write: changes within
+    SAVE_DELAY seconds are coalesced into a single atomic write. flush()
+    writes immediately and runs at exit. Observers are called with the new
+    value whenever a key changes.
+
+    Keys of an optional journal.Journal are not written to the file. Each
+    change to them is appended to the journal right away instead.
+    """
+
+    def __init__(self, filename, journal=None):
         self.filename = Path(filename)
+        self.journal = journal
+        self.lock = threading.RLock()
+        # Keeps writes in order without blocking changes while writing
+        self.write_lock = threading.Lock()
+        self.observers = {}
+        self.save_timer = None
+        self.dirty = False
         self.load()
+        atexit.register(self.flush)
+
+    @property
+    def configuration(self):
+        return self._configuration
 
     def load(self):
         if self.filename.exists():
             with self.filename.open() as f:
-                self.configuration = json.load(f)
+                configuration = json.load(f)
         else:
-            self.configuration = {}
+            configuration = {}
+
+        if self.journal is not None:
+            state = self.journal.load()
+            # Moves state from configuration files written before the journal
+            migrated_keys = [key for key in self.journal.keys if key in configuration]
+            for key in migrated_keys:
+                if key not in state:
+                    self.journal.set(key, configuration[key])
+                    state[key] = configuration[key]
+            configuration.update(state)
+            if migrated_keys:
+                self._configuration = configuration
+                self.dirty = True
+                self.flush()
+        self._configuration = configuration
+
+    def snapshot(self):
+        """Returns the current configuration. It must not be modified."""
+        return self._configuration
 
     def save(self):
-        with self.filename.open("w") as f:
-            json.dump(self.configuration, f, indent=2)
+        with self.lock:
+            self.dirty = True
+            if self.save_timer is None:
+                self.save_timer = threading.Timer(SAVE_DELAY, self.flush)
+                self.save_timer.daemon = True
+                self.save_timer.start()
+
+    def flush(self):
+        """Writes pending changes now, via a synced temporary file."""
+        with self.write_lock:
+            with self.lock:
+                if self.save_timer is not None:
+                    self.save_timer.cancel()
+                    self.save_timer = None
+                if not self.dirty:
+                    return
+                self.dirty = False
+                configuration = self._configuration
+            if self.journal is not None:
+                configuration = {
+                    key: value
+                    for key, value in configuration.items()
+                    if key not in self.journal.keys
+                }
+            temp_filename = self.filename.with_name(f"{self.filename.name}.tmp")
+            with temp_filename.open("w") as f:
+                json.dump(configuration, f, indent=2)
+                f.flush()
+                os.fsync(f.fileno())
+            os.replace(temp_filename, self.filename)
+
+    def add_observer(self, key, callback):
+        """Calls callback(value) on the changing thread whenever key changes."""
+        with self.lock:
+            self.observers.setdefault(key, []).append(callback)
+
+    def remove_observer(self, key, callback):
+        with self.lock:
+            self.observers.get(key, []).remove(callback)
+
+    def _replace(self, key, update):
+        with self.lock:
+            old_value = self._configuration.get(key)
+            configuration = dict(self._configuration)
+            result = update(configuration)
+            self._configuration = configuration
+            if self.journal is not None and key in self.journal.keys:
+                if key in configuration:
+                    self.journal.set(key, configuration[key])
+                else:
+                    self.journal.delete(key)
+            observers = list(self.observers.get(key, []))
+        value = configuration.get(key)
+        if value != old_value:
+            for callback in observers:
+                callback(value)
+        return result
 
     def get(self, key, default=None):
-        return self.configuration.get(key, default)
+        return self._configuration.get(key, default)
 
     def set(self, key, value):
-        self.configuration[key] = value
+        self._replace(key, lambda configuration: configuration.update({key: value}))
 
     def pop(self, key, default=None):
-        return self.configuration.pop(key, default)
+        return self._replace(key, lambda configuration: configuration.pop(key, default))
 
     def __getitem__(self, key):
-        return self.configuration[key]
+        return self._configuration[key]
 
     def __setitem__(self, key, value):
-        self.configuration[key] = value
+        self.set(key, value)
 
     def __delitem__(self, key):
-        del self.configuration[key]
+        def delete(configuration):
+            del configuration[key]
+
+        self._replace(key, delete)
 
     def __contains__(self, key):
-        return key in self.configuration
+        return key in self._configuration
 
     def __iter__(self):
-        return iter(self.configuration)
+        return iter(self._configuration)
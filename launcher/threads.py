@@ -4,11 +4,20 @@ import os
 import pathlib
 import shutil
 import time
+from concurrent.futures import ThreadPoolExecutor
 
 import requests
 from PySide6.QtCore import QObject, QRunnable, QThread, Signal, Slot
 
-from launcher import download, news, server_status, utils
+from launcher import (
+    autologin,
+    credentials,
+    download,
+    news,
+    repair,
+    self_update,
+    utils,
+)
 
 logging.basicConfig(
     filename="launcher.log",
@@ -35,6 +44,7 @@ class NewsSignals(QObject):
     news = Signal(list)
     changelog = Signal(list)
     launcher_news = Signal(list)
+    failed = Signal(str)
 
 
 class NewsTask(QRunnable):
@@ -44,17 +54,21 @@ class NewsTask(QRunnable):
         self.signals = NewsSignals()
 
     def run(self):
+        try:
+            self.fetch()
+        except (requests.RequestException, ValueError, KeyError) as e:
+            logger.warning(f"Fetching {self.news_type} failed: {e}")
+            self.signals.failed.emit(self.news_type)
+
+    def fetch(self):
         if self.news_type == "news":
-            news_object = news.fetch_announcements()
-            news_object = [(n["timestamp"], n["content"]) for n in news_object]
+            news_object = news.update_news("news", news.fetch_announcements())
             self.signals.news.emit(news_object)
         elif self.news_type == "changelog":
-            news_object = news.fetch_changelog()
-            news_object = [(n["timestamp"], n["content"]) for n in news_object]
+            news_object = news.update_news("changelog", news.fetch_changelog())
             self.signals.changelog.emit(news_object)
         elif self.news_type == "launcher-news":
-            news_object = news.get_release_notes()
-            news_object = [(n["timestamp"], n["content"]) for n in news_object]
+            news_object = news.update_news("launcher-news", news.get_release_notes())
             self.signals.launcher_news.emit(news_object)
         else:
             logger.error(
@@ -64,26 +78,96 @@ class NewsTask(QRunnable):
 
 
 class ServerStatusSignals(QObject):
-    login_server_status = Signal(bool)
-    game_server_status = Signal(bool)
+    # Name, whether it is online and the latest connect and logon challenge
+    # RTTs in seconds
+    server_status = Signal(str, bool, object, object)
+    # Name and the summary of its latency history
+    server_history = Signal(str, object)
+    finished = Signal()
 
 
 class ServerStatusTask(QRunnable):
-    def __init__(self, server):
+    def __init__(self, monitor):
         super().__init__()
-        self.server = server
+        self.monitor = monitor
         self.signals = ServerStatusSignals()
 
     def run(self):
-        if self.server == "game":
-            self.signals.game_server_status.emit(server_status.check_game_server())
-        elif self.server == "login":
-            self.signals.login_server_status.emit(server_status.check_login_server())
-        else:
-            logger.error(
-                f"Provided {self.server} as server name. But server should "
-                "be one of {'game', 'login'}"
-            )
+        try:
+            statuses = self.monitor.sample()
+            for name, status in statuses.items():
+                self.signals.server_status.emit(
+                    name, status.online, status.rtt, status.handshake_rtt
+                )
+                self.signals.server_history.emit(name, status.summary())
+        finally:
+            self.signals.finished.emit()
+
+
+class UpdateCheckSignals(QObject):
+    outdated_files = Signal(list)
+    latest_release = Signal(str, list)
+    finished = Signal()
+
+
+class UpdateCheckTask(QRunnable):
+    """
+    Checks for outdated game files and a new launcher release in parallel.
+
+    Each result is emitted as soon as it is available. Results younger than
+    max_age seconds are served from the network cache. finished is emitted
+    last, also when a check failed.
+    """
+
+    def __init__(self, configuration, max_age=0, check_files=True):
+        super().__init__()
+        self.configuration = configuration.snapshot()
+        self.max_age = max_age
+        self.check_files = check_files
+        self.signals = UpdateCheckSignals()
+
+    def check_outdated_files(self):
+        self.signals.outdated_files.emit(
+            utils.find_outdated_files(self.configuration, self.max_age)
+        )
+
+    def check_latest_release(self):
+        self.signals.latest_release.emit(*utils.get_latest_release(self.max_age))
+
+    def run(self):
+        start_time = time.perf_counter()
+        with ThreadPoolExecutor(max_workers=2) as executor:
+            futures = [executor.submit(self.check_latest_release)]
+            if self.check_files:
+                futures.append(executor.submit(self.check_outdated_files))
+        for future in futures:
+            if future.exception() is not None:
+                logger.warning(f"Update check failed: {future.exception()}")
+        logger.info(
+            f"Update checks took {(time.perf_counter() - start_time) * 1000:.0f}ms"
+        )
+        self.signals.finished.emit()
+
+
+class CredentialsSignals(QObject):
+    credentials_loaded = Signal(object, object)
+
+
+class CredentialsTask(QRunnable):
+    """Reads the saved account name and password from the keyring."""
+
+    def __init__(self):
+        super().__init__()
+        self.signals = CredentialsSignals()
+
+    def run(self):
+        try:
+            account_name = credentials.get_account_name()
+            password = credentials.get_password()
+        except Exception as e:
+            logger.warning(f"Loading credentials failed: {e}")
+            account_name, password = None, None
+        self.signals.credentials_loaded.emit(account_name, password)
 
 
 class InstallWoWTaskSignals(QObject):
@@ -107,6 +191,104 @@ class InstallWoWTask(QThread):
         self.signals.install_finished.emit(self.install_successful)
 
 
+class AutoLoginTaskSignals(QObject):
+    # Whether the password was typed, and the seconds since the game started
+    login_finished = Signal(bool, float)
+
+
+class AutoLoginTask(QThread):
+    def __init__(self, process, install_folder, password, started_at, timeout):
+        super().__init__()
+        self.process = process
+        self.install_folder = install_folder
+        self.password = password
+        self.started_at = started_at
+        self.timeout = timeout
+        self.signals = AutoLoginTaskSignals()
+
+    def run(self):
+        ready = autologin.wait_until_ready(
+            self.process, self.install_folder, self.started_at, self.timeout
+        )
+        if ready:
+            credentials.type_password(self.password)
+        elapsed = time.time() - self.started_at
+        if ready:
+            logger.info(f"Entered the password {elapsed:.1f}s after starting the game")
+        self.signals.login_finished.emit(ready, elapsed)
+
+
+class RepairTaskSignals(QObject):
+    progress_update = Signal(int)
+    progress_label_update = Signal(str)
+    repair_finished = Signal(bool, int)
+
+
+class RepairTask(QThread):
+    def __init__(self, install_folder, manifest=None, damaged_files=()):
+        super().__init__()
+        self.install_folder = install_folder
+        self.manifest = manifest
+        self.damaged_files = damaged_files
+        self.signals = RepairTaskSignals()
+
+    def report_progress(self, done, total, message):
+        self.signals.progress_label_update.emit(message)
+        self.signals.progress_update.emit(done / max(total, 1) * 100)
+
+    def run(self):
+        try:
+            results = repair.repair_install(
+                self.install_folder,
+                self.manifest,
+                self.report_progress,
+                self.damaged_files,
+            )
+        except Exception as e:
+            logger.error(f"Repair failed: {e}")
+            return self.signals.repair_finished.emit(False, 0)
+        logger.info(f"Repair results: {results}")
+        self.signals.repair_finished.emit(all(results.values()), len(results))
+
+
+class LauncherUpdateTaskSignals(QObject):
+    update_prepared = Signal(bool, str)
+
+
+class LauncherUpdateTask(QThread):
+    def __init__(self, download_path, asset, assets, executable_path=None):
+        super().__init__()
+        self.download_path = download_path
+        self.asset = asset
+        self.assets = assets
+        self.executable_path = executable_path
+        self.signals = LauncherUpdateTaskSignals()
+
+    def run(self):
+        try:
+            new_path = self_update.prepare_update(
+                self.download_path, self.asset, self.assets, self.executable_path
+            )
+        except self_update.UpdateError as e:
+            logger.error(f"Preparing the launcher update failed: {e}")
+            return self.signals.update_prepared.emit(False, "")
+        self.signals.update_prepared.emit(True, str(new_path))
+
+
+class HandoffTaskSignals(QObject):
+    handoff_finished = Signal(bool)
+
+
+class HandoffTask(QThread):
+    def __init__(self, handoff):
+        super().__init__()
+        self.handoff = handoff
+        self.signals = HandoffTaskSignals()
+
+    def run(self):
+        self.signals.handoff_finished.emit(self.handoff.wait_until_ready())
+
+
 class BackgroundTaskSignals(QObject):
     progress_update = Signal(int)
     progress_label_update = Signal(str)
@@ -154,8 +336,20 @@ class BackgroundTask(QThread):
         else:
             self.mode = "wb"
 
+    def set_bandwidth_limit(self, bandwidth_limit):
+        self.bandwidth_limit = bandwidth_limit or 0
+
     @Slot()
     def run(self):
+        self.bandwidth_limit = self.settings.get("bandwidth", 0)
+        # Follows changes from the settings dialog while downloading
+        self.settings.add_observer("bandwidth", self.set_bandwidth_limit)
+        try:
+            self.download()
+        finally:
+            self.settings.remove_observer("bandwidth", self.set_bandwidth_limit)
+
+    def download(self):
         self.prepare_download()
         self.delete_temp_on_updated_etag()
 
@@ -182,7 +376,7 @@ class BackgroundTask(QThread):
                                 break
                     if chunk:
                         file.write(chunk)
-                        bandwidth_limit = self.settings.get("bandwidth", 0)
+                        bandwidth_limit = self.bandwidth_limit
                         if bandwidth_limit > 0 and chunk_time < (
                             8192 / (bandwidth_limit * 1024)
                         ):
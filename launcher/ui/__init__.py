@@ -20,5 +20,13 @@ from launcher.ui.logo import Logo
 from launcher.ui.news_area import NewsArea, NewsTab
 from launcher.ui.progress_bar import ProgressBar
 from launcher.ui.server_status_bar import ServerStatusBar
-from launcher.ui.settings import SettingsDialog
 from launcher.ui.top_bar import TopBar
+
+
+def __getattr__(name):
+    # The settings dialog is only imported once it is opened
+    if name == "SettingsDialog":
+        from launcher.ui.settings import SettingsDialog
+
+        return SettingsDialog
+    raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
@@ -1,3 +1,4 @@
+from PySide6.QtCore import QThreadPool
 from PySide6.QtGui import QCursor, Qt
 from PySide6.QtWidgets import (
     QCheckBox,
@@ -9,7 +10,7 @@ from PySide6.QtWidgets import (
     QWidget,
 )
 
-from launcher import credentials
+from launcher import credentials, threads
 from launcher.ui import fonts
 
 
@@ -73,9 +74,7 @@ class Login(QWidget):
         label_name.setStyleSheet(label_name_style)
         self.lineEdit_username = QLineEdit()
         self.lineEdit_username.setStyleSheet(line_edit_style)
-        account_name = credentials.get_account_name()
-        if account_name is not None:
-            self.lineEdit_username.setText(account_name)
+        self.lineEdit_username.setPlaceholderText("Loading...")
         self.lineEdit_username.textChanged.connect(self.username_changed)
         layout.addItem(
             QSpacerItem(0, 0, QSizePolicy.Expanding, QSizePolicy.Expanding), 0, 0
@@ -87,9 +86,7 @@ class Login(QWidget):
         label_password.setStyleSheet(label_name_style)
         self.lineEdit_password = QLineEdit()
         self.lineEdit_password.setStyleSheet(line_edit_style)
-        password_ = credentials.get_password()
-        if password_ is not None:
-            self.lineEdit_password.setText(password_)
+        self.lineEdit_password.setPlaceholderText("Loading...")
         self.lineEdit_password.textChanged.connect(self.password_editing_finished)
         self.lineEdit_password.setEchoMode(QLineEdit.Password)
 
@@ -124,6 +121,23 @@ class Login(QWidget):
 
         self.setLayout(layout)
 
+        # The keyring can take seconds to unlock, so it is read off-thread
+        self.credentials_task = threads.CredentialsTask()
+        self.credentials_task.signals.credentials_loaded.connect(self.set_credentials)
+        QThreadPool.globalInstance().start(self.credentials_task)
+
+    def set_credentials(self, account_name, password):
+        # The loaded values are already saved, so they are not written back
+        for line_edit, value in [
+            (self.lineEdit_username, account_name),
+            (self.lineEdit_password, password),
+        ]:
+            line_edit.setPlaceholderText("")
+            if value is not None and not line_edit.text():
+                line_edit.blockSignals(True)
+                line_edit.setText(value)
+                line_edit.blockSignals(False)
+
     def username_changed(self):
         credentials.set_account_name(self.lineEdit_username.text())
 
@@ -1,18 +1,26 @@
 import logging
+from functools import partial
 
 from PySide6 import QtCore
-from PySide6.QtGui import Qt
+from PySide6.QtCore import QAbstractListModel, QModelIndex, QSize
+from PySide6.QtGui import (
+    QAbstractTextDocumentLayout,
+    QFont,
+    QFontMetrics,
+    QPalette,
+    Qt,
+    QTextDocument,
+)
 from PySide6.QtWidgets import (
+    QAbstractItemView,
     QFrame,
-    QLabel,
-    QScrollArea,
+    QListView,
+    QStyledItemDelegate,
     QTabWidget,
-    QVBoxLayout,
-    QWidget,
 )
 
-from launcher import threads
-from launcher.ui import fonts, helpers
+from launcher import http, news, threads
+from launcher.ui import fonts
 
 logging.basicConfig(
     filename="launcher.log",
@@ -25,41 +33,154 @@ logging.basicConfig(
 logger = logging.getLogger("News Tabs")
 
 
-class NewsWidget(QWidget):
-    def __init__(self, parent=None, news=None):
-        super().__init__(parent)
-
-        self.news = news or []
-        self.news_time_labels = []
-        self.news_labels = []
-        self.layout = QVBoxLayout()
+# Space around the timestamp and the content of an item, in pixels
+PADDING = 5
+# Space between an item's divider and the next item
+SPACING = 6
+# Rows laid out per event loop pass
+LAYOUT_BATCH_SIZE = 10
 
-        self.setLayout(self.layout)
 
-    def create_news(self):
-        for news in self.news:
-            news_time = QLabel(news["timestamp"])
-            news_time.setFont(fonts.NORMAL)
-            news_time.setStyleSheet("font-weight: bold;")
+class NewsModel(QAbstractListModel):
+    """List of news items, updated by diffing against the shown items by id."""
 
-            news = QLabel(news["content"])
-            news.setWordWrap(True)
+    IdRole = Qt.UserRole
+    TimestampRole = Qt.UserRole + 1
 
-            self.layout.addWidget(news_time)
-            self.layout.addWidget(news)
-            self.layout.addWidget(helpers.create_divider())
+    def __init__(self, parent=None):
+        super().__init__(parent)
+        self.news = []
+
+    def rowCount(self, parent=QModelIndex()):
+        return 0 if parent.isValid() else len(self.news)
+
+    def data(self, index, role=Qt.DisplayRole):
+        if not index.isValid():
+            return None
+        item = self.news[index.row()]
+        if role == Qt.DisplayRole:
+            return item["content"]
+        if role == self.TimestampRole:
+            return item["timestamp"]
+        if role == self.IdRole:
+            return item["id"]
+        return None
 
     def set_news(self, news):
-        self.news = news
-        self.create_news()
+        ids = {item["id"] for item in news}
+        for row in reversed(range(len(self.news))):
+            if self.news[row]["id"] not in ids:
+                self.beginRemoveRows(QModelIndex(), row, row)
+                del self.news[row]
+                self.endRemoveRows()
+
+        for row, item in enumerate(news):
+            if row < len(self.news) and self.news[row]["id"] == item["id"]:
+                self.update_row(row, item)
+                continue
+            old_row = next(
+                (
+                    old_row
+                    for old_row in range(row + 1, len(self.news))
+                    if self.news[old_row]["id"] == item["id"]
+                ),
+                None,
+            )
+            if old_row is None:
+                self.beginInsertRows(QModelIndex(), row, row)
+                self.news.insert(row, item)
+                self.endInsertRows()
+            else:
+                self.beginMoveRows(QModelIndex(), old_row, old_row, QModelIndex(), row)
+                self.news.insert(row, self.news.pop(old_row))
+                self.endMoveRows()
+                self.update_row(row, item)
+
+    def update_row(self, row, item):
+        if self.news[row] != item:
+            self.news[row] = item
+            index = self.index(row)
+            self.dataChanged.emit(index, index)
+
+
+class NewsDelegate(QStyledItemDelegate):
+    """
+    Paints an item as its timestamp, its content and a divider. The rich
+    text document of each item is kept until its content changes.
+    """
+
+    def __init__(self, parent=None):
+        super().__init__(parent)
+        self.documents = {}
+        self.timestamp_font = QFont(fonts.NORMAL)
+        self.timestamp_font.setBold(True)
+
+    def document(self, index, font, width):
+        item_id = index.data(NewsModel.IdRole)
+        content = index.data(Qt.DisplayRole)
+        cached = self.documents.get(item_id)
+        if cached is None or cached[0] != content:
+            document = QTextDocument()
+            document.setDefaultFont(font)
+            document.setDocumentMargin(PADDING)
+            # Interpreted like QLabel does by default
+            if Qt.mightBeRichText(content):
+                document.setHtml(content)
+            else:
+                document.setPlainText(content)
+            cached = (content, document)
+            self.documents[item_id] = cached
+        document = cached[1]
+        if document.textWidth() != width:
+            document.setTextWidth(width)
+        return document
+
+    def prune(self, ids):
+        for item_id in list(self.documents):
+            if item_id not in ids:
+                del self.documents[item_id]
+
+    def timestamp_height(self):
+        return QFontMetrics(self.timestamp_font).height() + 2 * PADDING
+
+    def sizeHint(self, option, index):
+        width = self.parent().viewport().width()
+        document = self.document(index, option.font, width)
+        height = self.timestamp_height() + document.size().height() + 1 + SPACING
+        return QSize(width, int(height))
+
+    def paint(self, painter, option, index):
+        rect = option.rect
+        painter.save()
+        painter.setPen(Qt.white)
+        painter.setFont(self.timestamp_font)
+        timestamp_rect = rect.adjusted(PADDING, PADDING, -PADDING, 0)
+        timestamp_rect.setHeight(self.timestamp_height() - 2 * PADDING)
+        painter.drawText(
+            timestamp_rect,
+            Qt.AlignLeft | Qt.AlignVCenter,
+            index.data(NewsModel.TimestampRole),
+        )
+
+        document = self.document(index, option.font, rect.width())
+        painter.translate(rect.left(), rect.top() + self.timestamp_height())
+        context = QAbstractTextDocumentLayout.PaintContext()
+        context.palette.setColor(QPalette.Text, Qt.white)
+        document.documentLayout().draw(painter, context)
+        painter.restore()
 
+        divider_y = rect.bottom() - SPACING
+        painter.save()
+        painter.setPen(Qt.white)
+        painter.drawLine(rect.left(), divider_y, rect.right(), divider_y)
+        painter.restore()
 
-class NewsArea(QScrollArea):
+
+class NewsArea(QListView):
     def __init__(self, parent=None, news=None):
         super().__init__(parent)
-        self.setWidgetResizable(True)
         self.setFrameShape(QFrame.NoFrame)
-        self.news = news
+        self.news = []
 
         scroll_bar_style = """
             QScrollBar:vertical {
@@ -96,26 +217,28 @@ class NewsArea(QScrollArea):
         self.setHorizontalScrollBarPolicy(Qt.ScrollBarAlwaysOff)
         self.setVerticalScrollBarPolicy(Qt.ScrollBarAsNeeded)
         self.verticalScrollBar().setStyleSheet(scroll_bar_style)
-        self.news_widget = NewsWidget(self, news)
-        self.news_widget.setObjectName("news")
-        self.news_widget.setStyleSheet(
-            """
-            QWidget#news {
-                background-color: transparent;
-            }
-            QLabel {
-                color: white;
-                background-color: transparent;
-                padding: 5px
-            }"""
-        )
-        self.setWidget(self.news_widget)
-        # self.setStyleSheet("QScrollArea { background-color: rgba(34, 59, 98, 220); }")
-        self.setStyleSheet("QScrollArea { background-color: rgba(27, 47, 78, 220); }")
+        # Every row has to be measured for the scroll range, and again when the
+        # width changes. Batched layout does that a few rows per event loop
+        # pass, so a resize does not block on all documents. Only visible rows
+        # are painted.
+        self.setVerticalScrollMode(QAbstractItemView.ScrollPerPixel)
+        self.setResizeMode(QListView.Adjust)
+        self.setLayoutMode(QListView.Batched)
+        self.setBatchSize(LAYOUT_BATCH_SIZE)
+        self.setSelectionMode(QAbstractItemView.NoSelection)
+        self.setFocusPolicy(Qt.NoFocus)
+        self.news_model = NewsModel(self)
+        self.news_delegate = NewsDelegate(self)
+        self.setModel(self.news_model)
+        self.setItemDelegate(self.news_delegate)
+        # self.setStyleSheet("QListView { background-color: rgba(34, 59, 98, 220); }")
+        self.setStyleSheet("QListView { background-color: rgba(27, 47, 78, 220); }")
+        self.set_news(news or [])
 
     def set_news(self, news):
         self.news = news
-        self.news_widget.set_news(news)
+        self.news_model.set_news(news)
+        self.news_delegate.prune({item["id"] for item in news})
 
 
 class NewsTab(QTabWidget):
@@ -138,6 +261,14 @@ class NewsTab(QTabWidget):
 
         self.threadpool = QtCore.QThreadPool()
         self.threadpool.setMaxThreadCount(3)
+        self.backoffs = {
+            news_type: http.Backoff()
+            for news_type in ("news", "changelog", "launcher-news")
+        }
+        # Cached items are shown right away and replaced once fetched
+        self.news_area.set_news(news.get_cached_news("news"))
+        self.changelog_area.set_news(news.get_cached_news("changelog"))
+        self.launcher_area.set_news(news.get_cached_news("launcher-news"))
         self.request_news()
 
         self.setStyleSheet(
@@ -184,41 +315,34 @@ class NewsTab(QTabWidget):
         )
 
     def request_news(self):
-        news_task = threads.NewsTask("news")
-        news_task.signals.news.connect(self.set_news)
-
-        changelog_task = threads.NewsTask("changelog")
-        changelog_task.signals.changelog.connect(self.set_changelog)
-
-        launcher_news_task = threads.NewsTask("launcher-news")
-        launcher_news_task.signals.launcher_news.connect(self.set_launcher_news)
+        for news_type in self.backoffs:
+            self.start_news_task(news_type)
 
+    def start_news_task(self, news_type):
+        news_task = threads.NewsTask(news_type)
+        news_task.signals.news.connect(self.set_news)
+        news_task.signals.changelog.connect(self.set_changelog)
+        news_task.signals.launcher_news.connect(self.set_launcher_news)
+        news_task.signals.failed.connect(self.retry_news)
         self.threadpool.start(news_task)
-        self.threadpool.start(changelog_task)
-        self.threadpool.start(launcher_news_task)
+
+    def retry_news(self, news_type):
+        # Cached items stay visible while the endpoint is unreachable
+        delay = self.backoffs[news_type].next_delay()
+        logger.info(f"Retrying {news_type} in {delay:.1f} seconds")
+        QtCore.QTimer.singleShot(
+            int(delay * 1000), self, partial(self.start_news_task, news_type)
+        )
 
     def set_news(self, news):
-        if len(news) == 0:
-            news_task = threads.NewsTask("news")
-            news_task.signals.news.connect(self.set_news)
-            return self.threadpool.start(news_task)
-        news = [{"timestamp": n[0], "content": n[1]} for n in news]
+        self.backoffs["news"].reset()
         self.news_area.set_news(news)
 
     def set_changelog(self, news):
-        if len(news) == 0:
-            changelog_task = threads.NewsTask("changelog")
-            changelog_task.signals.changelog.connect(self.set_changelog)
-            return self.threadpool.start(changelog_task)
-        news = [{"timestamp": n[0], "content": n[1]} for n in news]
+        self.backoffs["changelog"].reset()
         logger.info("Setting changelog")
         self.changelog_area.set_news(news)
 
     def set_launcher_news(self, news):
-        if len(news) == 0:
-            launcher_news_task = threads.NewsTask("launcher-news")
-            launcher_news_task.signals.launcher_news.connect(self.set_launcher_news)
-            return self.threadpool.start(launcher_news_task)
-        news = [{"timestamp": n[0], "content": n[1]} for n in news]
-
+        self.backoffs["launcher-news"].reset()
         self.launcher_area.set_news(news)
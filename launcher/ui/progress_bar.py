@@ -1,4 +1,6 @@
-from PySide6.QtCore import QTimer
+import math
+import time
+
 from PySide6.QtGui import Qt
 from PySide6.QtWidgets import (
     QCheckBox,
@@ -13,6 +15,9 @@ from PySide6.QtWidgets import (
 
 from launcher.ui import fonts
 
+# Seconds between PLAY becoming available and the game starting on autoplay
+AUTOPLAY_DELAY = 5
+
 
 class Autoplay(QWidget):
     def __init__(self, parent=None):
@@ -47,31 +52,29 @@ class Autoplay(QWidget):
             self.window().configuration["autoplay"] = True
             self.window().configuration.save()
             if self.window().configuration.get("start_button_state", "") == "PLAY":
-                self.remaining_seconds = 5  # set the initial value of remaining seconds
-                self.autoplay_timer = QTimer()
-                self.autoplay_timer.timeout.connect(
-                    self.update_countdown_label
-                )  # connect the timer to the update_countdown_label method
-                self.autoplay_in_label.setText(f"{self.remaining_seconds} seconds")
-                self.autoplay_timer.start(
-                    1000
-                )  # start the timer to fire every 1000ms (1 second)
+                self.autoplay_deadline = time.time() + AUTOPLAY_DELAY
+                self.autoplay_in_label.setText(f"{AUTOPLAY_DELAY} seconds")
+                # Keeps counting down while the window is minimized
+                self.window().clock.subscribe(
+                    self.update_countdown_label, while_suspended=True
+                )
         else:
             self.window().configuration["autoplay"] = False
-            if hasattr(self, "autoplay_timer"):
-                self.autoplay_timer.stop()
-                self.autoplay_in_label.setText("")
+            self.stop_countdown()
             self.window().configuration.save()
 
-    def update_countdown_label(self):
-        self.remaining_seconds -= 1  # decrement the remaining seconds
-        self.autoplay_in_label.setText(
-            f"{self.remaining_seconds} seconds"
-        )  # update the label text
-        if self.remaining_seconds == 0:
-            self.autoplay_timer.stop()  # stop the timer when the countdown is over
-            self.autoplay_in_label.setText("")
+    def stop_countdown(self):
+        self.window().clock.unsubscribe(self.update_countdown_label)
+        self.autoplay_in_label.setText("")
+
+    def update_countdown_label(self, now):
+        # Ticks may arrive slightly early, which must not add a second
+        remaining_seconds = math.ceil(self.autoplay_deadline - now - 0.1)
+        if remaining_seconds <= 0:
+            self.stop_countdown()  # stop the countdown when it is over
             self.window().start_game()
+            return
+        self.autoplay_in_label.setText(f"{remaining_seconds} seconds")
 
 
 class ProgessBarLabel(QWidget):
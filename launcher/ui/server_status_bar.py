@@ -1,107 +1,20 @@
 import datetime
+import time
 
-import pytz
 from PySide6 import QtCore
-from PySide6.QtCore import Qt, QTimer
+from PySide6.QtCore import Qt
 from PySide6.QtGui import QColor, QPainter, QPen
 from PySide6.QtWidgets import QGridLayout, QLabel, QSizePolicy, QWidget
 
-from launcher import threads
-from launcher.ui import helpers
+from launcher import clock, server_status, threads
+from launcher.config import Config
+from launcher.ui import fonts, helpers
+from launcher.ui.sparkline import Sparkline
 
-
-def calculate_daily_reset_time():
-    # Set the target timezone to UTC-7
-    target_tz = pytz.timezone("America/Los_Angeles")
-
-    local_tz = datetime.datetime.now(pytz.timezone("UTC")).astimezone().tzinfo
-
-    # Get the current local time
-    now_local = datetime.datetime.now(local_tz)
-
-    # Convert to UTC
-    now_utc = now_local.astimezone(pytz.utc)
-
-    # Set the time to 5:00 am in UTC-7
-    target_time = datetime.time(5, 0)
-    target_dt = datetime.datetime.combine(now_utc.date(), target_time)
-    # Convert to the target timezone
-    target_dt_tz = target_tz.localize(target_dt)
-    if target_dt_tz < now_utc:
-        target_dt_tz += datetime.timedelta(days=1)
-    # Convert back to the local timezone
-    target_dt_local = target_dt_tz.astimezone(local_tz)
-
-    next_weekday = target_dt_local.weekday()
-    next_weekday_name = datetime.date(1900, 1, next_weekday + 1).strftime("%a")
-
-    # Calculate the time difference
-    time_diff = target_dt_local - now_local
-
-    # Get the total number of minutes until the target datetime
-    total_minutes = int(time_diff.total_seconds() / 60)
-
-    # Calculate the number of hours and minutes
-    hours = total_minutes // 60
-    minutes = total_minutes % 60
-
-    # Return the results as a tuple
-    return (next_weekday_name, target_dt_local.strftime("%H:%M"), hours, minutes)
-
-
-def calculate_weekly_reset_time():
-    # Set the target timezone to UTC-7
-    target_tz = pytz.timezone("America/Los_Angeles")
-
-    local_tz = datetime.datetime.now(pytz.timezone("UTC")).astimezone().tzinfo
-
-    # Get the current local time
-    now_local = datetime.datetime.now(local_tz)
-
-    # Convert to UTC
-    now_utc = now_local.astimezone(pytz.utc)
-
-    # Set the time to 5:00 am in UTC-7 on Tuesday
-    target_time = datetime.time(5, 0)
-    target_dt = datetime.datetime.combine(now_utc.date(), target_time)
-
-    days_until_reset_day = (
-        1 - now_utc.weekday()
-    ) % 7  # calculate days until next Tuesday
-    target_dt_tz = target_tz.localize(target_dt)
-
-    if days_until_reset_day == 0 and now_local > target_dt_tz:
-        days_until_reset_day = 7
-    # next_monday_date = today + datetime.timedelta(days=days_until_next_monday)
-    target_dt_tz += datetime.timedelta(days=days_until_reset_day)
-
-    # Convert to the target timezone
-
-    # Convert back to the local timezone
-    target_dt_local = target_dt_tz.astimezone(local_tz)
-
-    next_reset_day = target_dt_local.weekday()
-    next_reset_day_name = datetime.date(1900, 1, next_reset_day + 1).strftime("%a")
-
-    # Calculate the time difference
-    time_diff = target_dt_local - now_local
-
-    # Get the total number of minutes until the target datetime
-    total_minutes = int(time_diff.total_seconds() / 60)
-
-    # Calculate the number of days, hours, and minutes
-    days = total_minutes // (60 * 24)
-    hours = (total_minutes // 60) % 24
-    minutes = total_minutes % 60
-
-    # Return the results as a tuple
-    return (
-        next_reset_day_name,
-        target_dt_local.strftime("%H:%M"),
-        days,
-        hours,
-        minutes,
-    )
+# Seconds between server status probes, see ServerStatusBar
+STATUS_INTERVAL = 15
+MIN_STATUS_INTERVAL = 5
+MAX_STATUS_INTERVAL = 60
 
 
 class ServerStatusBar(QWidget):
@@ -132,77 +45,77 @@ class ServerStatusBar(QWidget):
             }
         """
 
-        game_server_label = QLabel("Game Server:")
-        game_server_label.setStyleSheet(server_label_style)
-
-        login_server_label = QLabel("Login Server:")
-        login_server_label.setStyleSheet(server_label_style)
-
-        self.game_server_status_label = QLabel("CHECKING")
-        self.game_server_status_label.setStyleSheet(status_label_style)
-
-        self.login_server_status_label = QLabel("CHECKING")
-        self.login_server_status_label.setStyleSheet(status_label_style)
-
-        daily_reset_label = QLabel()
-        daily_reset_label.setStyleSheet(server_label_style)
-
-        daily_reset_timer_label = QLabel()
-        daily_reset_timer_label.setStyleSheet(server_label_style)
-
-        weekly_reset_label = QLabel()
-        weekly_reset_label.setStyleSheet(server_label_style)
-
-        weekly_reset_timer_label = QLabel()
-        weekly_reset_timer_label.setStyleSheet(server_label_style)
-
-        (
-            next_weekday_name,
-            target_dt_local,
-            hours,
-            minutes,
-        ) = calculate_daily_reset_time()
-        daily_reset_label.setText(f"Daily Reset: {next_weekday_name} {target_dt_local}")
-        daily_reset_timer_label.setText(f"{hours:02d}h {minutes:02d}m until reset")
-
-        (
-            next_reset_day_name,
-            target_dt_local,
-            days,
-            hours,
-            minutes,
-        ) = calculate_weekly_reset_time()
-        weekly_reset_label.setText(
-            f"Weekly Reset: {next_reset_day_name} {target_dt_local}"
-        )
-        weekly_reset_timer_label.setText(
-            f"{days:02d}d {hours:02d}h {minutes:02d}m until reset"
-        )
-
-        server_layout.addWidget(game_server_label, 0, 0)
-        server_layout.addWidget(self.game_server_status_label, 0, 1)
-        server_layout.addWidget(login_server_label, 1, 0)
-        server_layout.addWidget(self.login_server_status_label, 1, 1)
-        server_layout.addWidget(helpers.create_divider(), 2, 0, 1, 2)
-        server_layout.addWidget(daily_reset_label, 3, 0, 1, 2)
-        server_layout.addWidget(daily_reset_timer_label, 4, 0, 1, 2)
-        server_layout.addWidget(weekly_reset_label, 5, 0, 1, 2)
-        server_layout.addWidget(weekly_reset_timer_label, 6, 0, 1, 2)
-
-        daily_reset_label.setAlignment(Qt.AlignCenter)
-        daily_reset_timer_label.setAlignment(Qt.AlignCenter)
-        weekly_reset_label.setAlignment(Qt.AlignCenter)
-        weekly_reset_timer_label.setAlignment(Qt.AlignCenter)
+        self.status_labels = {}
+        self.latency_labels = {}
+        self.sparklines = {}
+        # Each server takes a row for its status and one for its latency
+        for index, name in enumerate(Config.SERVERS):
+            server_label = QLabel(f"{name}:")
+            server_label.setStyleSheet(server_label_style)
+            status_label = QLabel("CHECKING")
+            status_label.setStyleSheet(status_label_style)
+            sparkline = Sparkline()
+            latency_label = QLabel()
+            latency_label.setFont(fonts.SMALL)
+            latency_label.setStyleSheet("color: white;")
+            server_layout.addWidget(server_label, 2 * index, 0)
+            server_layout.addWidget(status_label, 2 * index, 1)
+            server_layout.addWidget(sparkline, 2 * index + 1, 0, Qt.AlignRight)
+            server_layout.addWidget(latency_label, 2 * index + 1, 1)
+            self.status_labels[name] = status_label
+            self.latency_labels[name] = latency_label
+            self.sparklines[name] = sparkline
+        row = 2 * len(Config.SERVERS)
+
+        self.daily_reset_label = QLabel()
+        self.daily_reset_label.setStyleSheet(server_label_style)
+
+        self.daily_reset_timer_label = QLabel()
+        self.daily_reset_timer_label.setStyleSheet(server_label_style)
+
+        self.weekly_reset_label = QLabel()
+        self.weekly_reset_label.setStyleSheet(server_label_style)
+
+        self.weekly_reset_timer_label = QLabel()
+        self.weekly_reset_timer_label.setStyleSheet(server_label_style)
+
+        self.reset_times = clock.ResetTimes()
+        self.update_reset_labels(time.time())
+
+        server_layout.addWidget(helpers.create_divider(), row, 0, 1, 2)
+        server_layout.addWidget(self.daily_reset_label, row + 1, 0, 1, 2)
+        server_layout.addWidget(self.daily_reset_timer_label, row + 2, 0, 1, 2)
+        server_layout.addWidget(self.weekly_reset_label, row + 3, 0, 1, 2)
+        server_layout.addWidget(self.weekly_reset_timer_label, row + 4, 0, 1, 2)
+
+        self.daily_reset_label.setAlignment(Qt.AlignCenter)
+        self.daily_reset_timer_label.setAlignment(Qt.AlignCenter)
+        self.weekly_reset_label.setAlignment(Qt.AlignCenter)
+        self.weekly_reset_timer_label.setAlignment(Qt.AlignCenter)
 
         server_layout.setAlignment(Qt.AlignCenter)
 
+        # All servers are probed concurrently by a single task
+        self.monitor = server_status.ServerMonitor(
+            Config.SERVERS, handshake_targets=Config.AUTH_PROBE_SERVERS
+        )
+        self.sampling = False
+        self.status_changed = False
         self.threadpool = QtCore.QThreadPool()
-        self.threadpool.setMaxThreadCount(2)
-
-        self.timer = QTimer()
-        self.timer.timeout.connect(self.request_server_status)
-        self.timer.start(15000)  # 5000 milliseconds = 5 seconds
-        self.request_server_status()
+        self.threadpool.setMaxThreadCount(1)
+
+        # Probed every 5 seconds after a status changed, backing off to once
+        # a minute while all statuses stay the same
+        scheduler = parent.scheduler
+        scheduler.add(
+            "server status",
+            self.request_server_status,
+            STATUS_INTERVAL,
+            min_interval=MIN_STATUS_INTERVAL,
+            max_interval=MAX_STATUS_INTERVAL,
+            run_now=True,
+        )
+        parent.clock.subscribe(self.update_reset_labels)
         self.setLayout(server_layout)
         self.setMaximumWidth(parent.width * 0.25)
         self.setSizePolicy(QSizePolicy.Maximum, QSizePolicy.Maximum)
@@ -216,46 +129,84 @@ class ServerStatusBar(QWidget):
         painter.setPen(QPen(QColor("#D9D9D9"), 2))
         painter.drawRoundedRect(self.rect(), 5, 5)
 
-    def request_server_status(self):
-        if not self.window().isMinimized():
-            self.game_task = threads.ServerStatusTask("game")
-            self.game_task.signals.game_server_status.connect(
-                self.set_game_server_status
-            )
-
-            self.login_task = threads.ServerStatusTask("login")
-            self.login_task.signals.login_server_status.connect(
-                self.set_login_server_status
-            )
-            self.threadpool.start(self.game_task)
-            self.threadpool.start(self.login_task)
+    def update_reset_labels(self, now):
+        daily_reset, weekly_reset = self.reset_times.get(
+            datetime.datetime.fromtimestamp(now, datetime.timezone.utc)
+        )
+        # QLabel ignores setText with unchanged text, so this is cheap per tick
+        self.daily_reset_label.setText(
+            f"Daily Reset: {daily_reset:%a} {daily_reset:%H:%M}"
+        )
+        hours, minutes = divmod(int(daily_reset.timestamp() - now) // 60, 60)
+        self.daily_reset_timer_label.setText(f"{hours:02d}h {minutes:02d}m until reset")
 
-    def set_game_server_status(self, alive):
-        style = """
-                font-size: 16px;
-                margin-bottom: 2px;
-                font-weight: bold;
-        """
-        if alive:
-            current_style = style + "color: green;"
-            self.game_server_status_label.setText("ONLINE")
-            self.game_server_status_label.setStyleSheet(current_style)
-        else:
-            current_style = style + "color: red;"
-            self.game_server_status_label.setText("OFFLINE")
-            self.game_server_status_label.setStyleSheet(current_style)
+        self.weekly_reset_label.setText(
+            f"Weekly Reset: {weekly_reset:%a} {weekly_reset:%H:%M}"
+        )
+        hours, minutes = divmod(int(weekly_reset.timestamp() - now) // 60, 60)
+        days, hours = divmod(hours, 24)
+        self.weekly_reset_timer_label.setText(
+            f"{days:02d}d {hours:02d}h {minutes:02d}m until reset"
+        )
 
-    def set_login_server_status(self, alive):
+    def request_server_status(self):
+        if not self.sampling:
+            self.sampling = True
+            self.status_changed = False
+            self.status_task = threads.ServerStatusTask(self.monitor)
+            self.status_task.signals.server_status.connect(self.set_server_status)
+            self.status_task.signals.server_history.connect(self.set_server_history)
+            self.status_task.signals.finished.connect(self.finish_server_status)
+            self.threadpool.start(self.status_task)
+
+    def finish_server_status(self):
+        self.sampling = False
+        self.window().scheduler.report("server status", self.status_changed)
+
+    def set_server_status(self, name, alive, rtt, handshake_rtt):
         style = """
                 font-size: 16px;
                 margin-bottom: 2px;
                 font-weight: bold;
         """
+        label = self.status_labels[name]
+        online_text = "ONLINE" if alive else "OFFLINE"
+        if label.text() != online_text:
+            self.status_changed = True
         if alive:
-            current_style = style + "color: green;"
-            self.login_server_status_label.setText("ONLINE")
-            self.login_server_status_label.setStyleSheet(current_style)
+            label.setText("ONLINE")
+            label.setStyleSheet(style + "color: green;")
+            latency = f"{rtt * 1000:.0f} ms"
+            if handshake_rtt is not None:
+                latency += f", logon {handshake_rtt * 1000:.0f} ms"
+            self.latency_labels[name].setText(latency)
         else:
-            current_style = style + "color: red;"
-            self.login_server_status_label.setText("OFFLINE")
-            self.login_server_status_label.setStyleSheet(current_style)
+            label.setText("OFFLINE")
+            label.setStyleSheet(style + "color: red;")
+            self.latency_labels[name].setText("")
+
+    def set_server_history(self, name, summary):
+        self.sparklines[name].set_values(summary["rtts"])
+        lines = []
+        for window, (median, p95, uptime) in summary["windows"].items():
+            if uptime is None:
+                continue
+            line = f"Last {window // 60} min: {uptime:.0%} up"
+            if median is not None:
+                line += f", {median * 1000:.0f} ms median, {p95 * 1000:.0f} ms p95"
+            lines.append(line)
+        for window, (median, p95, uptime) in summary.get(
+            "handshake_windows", {}
+        ).items():
+            if median is not None:
+                lines.append(
+                    f"Last {window // 60} min logon: {uptime:.0%} answered, "
+                    f"{median * 1000:.0f} ms median, {p95 * 1000:.0f} ms p95"
+                )
+        tooltip = "\n".join(lines)
+        for widget in (
+            self.status_labels[name],
+            self.latency_labels[name],
+            self.sparklines[name],
+        ):
+            widget.setToolTip(tooltip)
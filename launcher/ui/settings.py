@@ -18,7 +18,7 @@ from PySide6.QtWidgets import (
     QVBoxLayout,
 )
 
-from launcher import credentials
+from launcher import autologin, credentials
 from launcher.ui import fonts, helpers
 from launcher.ui.button import Button
 from launcher.ui.quit_button import QuitButton
@@ -88,8 +88,25 @@ class SettingsDialog(QDialog):
             addon_path_button.setEnabled(False)
             addon_path_button.setToolTip("Addon folder does not exist.")
 
+        repair_button = Button(self, "Repair Client", self.repair_client)
+        repair_button.setToolTip(
+            "Checks the client files and downloads or re-extracts only the "
+            "damaged ones."
+        )
+        if (
+            not self.installation_path.exists()
+            or self.main_window.configuration.get("install_in_progress", False)
+            or self.main_window.task is not None
+        ):
+            repair_button.setEnabled(False)
+            repair_button.setToolTip(
+                "Cannot repair while no client is installed or a download is "
+                "in progress."
+            )
+
         installation_layout.addWidget(installation_path_button)
         installation_layout.addWidget(addon_path_button)
+        installation_layout.addWidget(repair_button)
 
         # Create a horizontal divider line
 
@@ -178,22 +195,24 @@ class SettingsDialog(QDialog):
         self.delete_client_zip.setFont(fonts.NORMAL)
         self.delete_client_zip.toggled.connect(self.set_delete_client_zip)
 
-        password_wait_timer_layout = QHBoxLayout()
-        password_wait_timer_layout.setAlignment(Qt.AlignLeft)
-        password_wait_timer_label = QLabel("Delay until password is entered")
-        password_wait_timer_label.setFont(fonts.NORMAL)
-
-        self.password_wait_timer = QSpinBox()
-        self.password_wait_timer.setRange(0, 10000000)
-        self.password_wait_timer.setSingleStep(1)
-        self.password_wait_timer.setSuffix(" s")
-        self.password_wait_timer.setValue(
-            self.main_window.configuration.get("password_wait_timer", 5)
+        autologin_timeout_layout = QHBoxLayout()
+        autologin_timeout_layout.setAlignment(Qt.AlignLeft)
+        autologin_timeout_label = QLabel("Wait for the login screen at most")
+        autologin_timeout_label.setFont(fonts.NORMAL)
+
+        self.autologin_timeout = QSpinBox()
+        self.autologin_timeout.setRange(1, 10000000)
+        self.autologin_timeout.setSingleStep(1)
+        self.autologin_timeout.setSuffix(" s")
+        self.autologin_timeout.setValue(
+            self.main_window.configuration.get(
+                "autologin_timeout", autologin.READY_TIMEOUT
+            )
         )
-        self.password_wait_timer.valueChanged.connect(self.set_password_wait_timer)
+        self.autologin_timeout.valueChanged.connect(self.set_autologin_timeout)
 
-        password_wait_timer_layout.addWidget(password_wait_timer_label)
-        password_wait_timer_layout.addWidget(self.password_wait_timer)
+        autologin_timeout_layout.addWidget(autologin_timeout_label)
+        autologin_timeout_layout.addWidget(self.autologin_timeout)
 
         layout.addLayout(top_bar_layout)
         layout.addWidget(installation_label)
@@ -206,7 +225,7 @@ class SettingsDialog(QDialog):
         layout.addLayout(bandwidth_layout)
         layout.addWidget(self.ignore_updates)
         layout.addWidget(self.delete_client_zip)
-        layout.addLayout(password_wait_timer_layout)
+        layout.addLayout(autologin_timeout_layout)
         layout.addItem(QSpacerItem(0, 0, QSizePolicy.Expanding, QSizePolicy.Expanding))
 
         self.setStyleSheet(
@@ -241,6 +260,10 @@ class SettingsDialog(QDialog):
 
         self.setLayout(layout)
 
+    def repair_client(self):
+        self.close()
+        self.main_window.start_repair()
+
     def delete_cache(self):
         shutil.rmtree(self.installation_path / "Cache")
 
@@ -308,10 +331,10 @@ class SettingsDialog(QDialog):
             self.main_window.configuration["bandwidth"] = self.bandwidth.value()
             self.main_window.configuration.save()
 
-    def set_password_wait_timer(self):
+    def set_autologin_timeout(self):
         self.main_window.configuration[
-            "password_wait_timer"
-        ] = self.password_wait_timer.value()
+            "autologin_timeout"
+        ] = self.autologin_timeout.value()
         self.main_window.configuration.save()
 
     def delete_launcher_cache(self):
@@ -0,0 +1,49 @@
+from PySide6.QtCore import QPointF, QSize
+from PySide6.QtGui import QColor, QPainter, QPen, QPolygonF
+from PySide6.QtWidgets import QSizePolicy, QWidget
+
+
+class Sparkline(QWidget):
+    """
+    Small line chart of the most recent values. None values are failed
+    samples, they are drawn as red ticks along the bottom.
+    """
+
+    def __init__(self, parent=None, samples=40):
+        super().__init__(parent)
+        self.samples = samples
+        self.values = []
+        self.setSizePolicy(QSizePolicy.Fixed, QSizePolicy.Fixed)
+
+    def sizeHint(self):
+        return QSize(60, 18)
+
+    def set_values(self, values):
+        self.values = values[-self.samples :]
+        self.update()
+
+    def paintEvent(self, event):
+        if not self.values:
+            return
+        painter = QPainter(self)
+        painter.setRenderHint(QPainter.Antialiasing)
+        rect = self.rect().adjusted(1, 1, -1, -1)
+        step = rect.width() / max(self.samples - 1, 1)
+        # Right-aligned, so the newest sample is always at the right edge
+        left = rect.right() - step * (len(self.values) - 1)
+        highest = max((value for value in self.values if value is not None), default=0)
+
+        line = QPolygonF()
+        painter.setPen(QPen(QColor("red"), 1))
+        for index, value in enumerate(self.values):
+            x = left + index * step
+            if value is None:
+                painter.drawLine(
+                    QPointF(x, rect.bottom() - 3), QPointF(x, rect.bottom())
+                )
+                continue
+            height = value / highest if highest else 0
+            line.append(QPointF(x, rect.bottom() - height * rect.height()))
+
+        painter.setPen(QPen(QColor("#D9D9D9"), 1))
+        painter.drawPolyline(line)
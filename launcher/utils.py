@@ -5,9 +5,7 @@ import pathlib
 import shutil
 import zipfile
 
-import requests
-
-from launcher import download, version
+from launcher import download, github, manifest, version
 from launcher.config import Config
 
 logging.basicConfig(
@@ -30,18 +28,8 @@ def calculate_md5(filepath):
 
 
 def check_wow_install(install_folder):
-    files = [
-        "common.MPQ",
-        "common-2.MPQ",
-        "expansion.MPQ",
-        "lichking.MPQ",
-        "patch.MPQ",
-        "patch-2.MPQ",
-        "patch-3.MPQ",
-    ]
-
-    for file in files:
-        data_file = install_folder / "Data" / file
+    for file in Config.CLIENT_ARCHIVES:
+        data_file = install_folder / file
         logger.info(f"Checking: {data_file}")
         if not data_file.exists():
             logger.info(
@@ -61,12 +49,12 @@ def prepare_wow_folder(install_folder, wow_client_zip_path, delete_client_zip=Fa
             zip_ref.extractall(install_folder)
 
     logger.info("Moving files")
-    source_path = install_folder / "WoW 3.3.5/"
+    source_path = install_folder / Config.CLIENT_ZIP_ROOT
 
     files = source_path.glob("**/*")
     for file in files:
         parts = list(file.parts)
-        parts.remove("WoW 3.3.5")
+        parts.remove(Config.CLIENT_ZIP_ROOT)
         destination = pathlib.Path(*parts)
         logger.info(f"Moving {file}")
         shutil.move(file, destination)
@@ -79,18 +67,12 @@ def prepare_wow_folder(install_folder, wow_client_zip_path, delete_client_zip=Fa
         except FileNotFoundError:
             logger.info(f"Folder does not exist: {source_path}")
 
-    original_wow_exe_path = install_folder / "Wow.exe"
-    if os.path.exists(original_wow_exe_path):
-        logger.info("Removing old Wow.exe")
-        os.remove(original_wow_exe_path)
-
-    cinematics = ["wow_fotlk_1024.avi", "wow_wrathgate_1024.avi"]
-    cinematics_folder = install_folder / "Data" / "enUS" / "Interface" / "Cinematics"
-    for cinematic in cinematics:
-        cinematic_path = cinematics_folder / cinematic
-        if cinematic_path.exists():
-            logger.info(f"Removing cinematics file: {cinematic_path}")
-            os.remove(cinematic_path)
+    # Removes the original Wow.exe and the cinematics
+    for file in Config.REMOVED_CLIENT_FILES:
+        file_path = install_folder / file
+        if file_path.exists():
+            logger.info(f"Removing {file_path}")
+            os.remove(file_path)
 
     logger.info("Changing realmlist")
     realm_list_path = install_folder / "Data" / "enUS" / "realmlist.wtf"
@@ -149,28 +131,44 @@ def compare_versions(v1, v2):
     return 0
 
 
-def get_latest_release():
-    # Construct the URL for the GitHub API request
-    url = "https://api.github.com/repos/chtheiss/duskhaven_launcher/releases/latest"
+def get_update_check_ttl(configuration):
+    # Seconds for which the results of remote update checks are reused
+    if configuration.get("force_update_check", False):
+        return 0
+    return configuration.get("update_check_ttl", Config.UPDATE_CHECK_TTL)
 
-    # Make the API request and parse the response as JSON
-    response = requests.get(url)
-    data = response.json()
 
-    # Extract the tag name and asset names
-    try:
-        tag_name = data["tag_name"]
-    except KeyError:
+def get_latest_release(ttl=None):
+    release = github.get_latest_release(ttl)
+    if release is None:
         return (version.version, [])
-    assets = [asset for asset in data["assets"]]
 
-    # Return the results as a tuple
-    return (tag_name, assets)
+    # Return the tag name and assets as a tuple
+    return (release["tag_name"], release["assets"])
 
 
-def add_outdated_files_to_queue(configuration):
+def get_download_url(configuration, file):
+    if configuration.get("manifest_url", Config.MANIFEST_URL):
+        url = manifest.file_url(file)
+        if url is not None:
+            return url
+    return Config.LINKS[file]
+
+
+def find_outdated_files(configuration, ttl=None):
     install_folder = pathlib.Path(configuration["installation_path"])
-    donwload_queue = configuration.get("download_queue", [])
+    manifest_url = configuration.get("manifest_url", Config.MANIFEST_URL)
+    if manifest_url:
+        files = None
+        # Until the client zip is installed it provides the client files, so
+        # only the custom files are compared
+        if "wow-client.zip" in configuration.get(
+            "download_queue", []
+        ) or not check_wow_install(install_folder):
+            files = [file for file in Config.LINKS if file != "wow-client.zip"]
+        return manifest.find_outdated_files(manifest_url, install_folder, ttl, files)
+
+    outdated_files = []
     dest_paths = [
         install_folder / "wow.exe",
         install_folder / "Data" / "patch-5.MPQ",
@@ -184,21 +182,14 @@ def add_outdated_files_to_queue(configuration):
         else:
             full_file = file
         url = Config.LINKS[full_file]
-        if (
-            download.file_requires_update(
-                url,
-                dest_path,
-                configuration.get("file_versions", {}).get(file, ""),
-            )
-            and full_file not in donwload_queue
-            and (
-                configuration.get("install_in_progress", False)
-                or not configuration.get("ignore_updates", False)
-            )
+        if download.file_requires_update(
+            url,
+            dest_path,
+            configuration.get("file_versions", {}).get(file, ""),
+            ttl,
         ):
-            donwload_queue.append(full_file)
-    configuration["download_queue"] = donwload_queue
-    configuration.save()
+            outdated_files.append(full_file)
+    return outdated_files
 
 
 def check_first_time_user(configuration):
@@ -0,0 +1,318 @@
+import hashlib
+import json
+import logging
+import mmap
+import os
+import pathlib
+import shutil
+import threading
+import zipfile
+import zlib
+from concurrent.futures import ThreadPoolExecutor
+
+from launcher.config import Config
+
+logging.basicConfig(
+    filename="launcher.log",
+    filemode="a",
+    format="%(asctime)s,%(msecs)d %(name)s %(levelname)s %(message)s",
+    datefmt="%H:%M:%S",
+    level=logging.INFO,
+)
+
+logger = logging.getLogger("Verify")
+
+HASH_ALGORITHM = "sha256"
+INDEX_FILENAME = "hash_index.json"
+CRC32_BUFFER_SIZE = 1024 * 1024
+
+# The launcher removes or rewrites these files after extracting the client zip
+# and replaces the ones in Config.LINKS with custom versions.
+EXCLUDED_CLIENT_FILES = {
+    file.lower()
+    for file in Config.REMOVED_CLIENT_FILES
+    + Config.MODIFIED_CLIENT_FILES
+    + list(Config.LINKS)
+}
+
+
+def hash_file(path, algorithm=HASH_ALGORITHM):
+    """
+    Hashes a file by memory-mapping it.
+
+    hashlib releases the GIL while digesting large buffers, so several files can
+    be hashed in parallel from a thread pool.
+
+    Args:
+    path (pathlib.Path): The file to hash.
+    algorithm (str): Any algorithm name accepted by hashlib.new or "crc32".
+
+    Returns:
+    str: The hex digest of the file content.
+    """
+    if algorithm == "crc32":
+        return crc32_file(path)
+    hash = hashlib.new(algorithm)
+    with open(path, "rb") as file:
+        # Empty files cannot be memory-mapped
+        if os.fstat(file.fileno()).st_size > 0:
+            with mmap.mmap(file.fileno(), 0, access=mmap.ACCESS_READ) as mapped:
+                hash.update(mapped)
+    return hash.hexdigest()
+
+
+def hash_bytes(data, algorithm=HASH_ALGORITHM):
+    """Returns the hex digest of data, in the same format as hash_file."""
+    if algorithm == "crc32":
+        return f"{zlib.crc32(data):08x}"
+    return hashlib.new(algorithm, data).hexdigest()
+
+
+def check_algorithm(algorithm):
+    """
+    Raises:
+    ValueError: If algorithm is neither "crc32" nor supported by hashlib.
+    """
+    if algorithm != "crc32" and algorithm not in hashlib.algorithms_available:
+        raise ValueError(f"Unsupported hash algorithm {algorithm}")
+
+
+def crc32_file(path):
+    """
+    Computes the CRC32 of a file with large buffered reads.
+
+    zlib releases the GIL for large buffers, so this parallelizes like hash_file.
+
+    Returns:
+    str: The CRC32 as eight hex digits, the same format as used for manifests.
+    """
+    crc = 0
+    buffer = bytearray(CRC32_BUFFER_SIZE)
+    view = memoryview(buffer)
+    with open(path, "rb", buffering=0) as file:
+        while size := file.readinto(buffer):
+            crc = zlib.crc32(view[:size], crc)
+    return f"{crc:08x}"
+
+
+def load_manifest(path):
+    """
+    Loads a manifest describing the expected client files.
+
+    The manifest is a JSON document of the form
+    {"algorithm": "sha256", "files": {"Data/common.MPQ": {"size": 1, "digest": ""}}}
+    where the file paths are relative to the installation folder.
+    """
+    with open(path) as f:
+        manifest = json.load(f)
+    manifest.setdefault("algorithm", HASH_ALGORITHM)
+    manifest.setdefault("files", {})
+    return manifest
+
+
+class HashIndex:
+    """
+    Persistent cache of file digests.
+
+    Entries are keyed by the file path and remember the size, mtime_ns and inode
+    the digest was computed for, so a file only has to be hashed again once it
+    changed on disk.
+    """
+
+    def __init__(self, filename=INDEX_FILENAME):
+        self.filename = pathlib.Path(filename)
+        self.lock = threading.Lock()
+        self.dirty = False
+        self.load()
+
+    def load(self):
+        try:
+            with self.filename.open() as f:
+                self.entries = json.load(f)
+        except (FileNotFoundError, json.decoder.JSONDecodeError):
+            self.entries = {}
+
+    def save(self):
+        with self.lock:
+            if not self.dirty:
+                return
+            temp_filename = self.filename.with_name(f"{self.filename.name}.tmp")
+            with temp_filename.open("w") as f:
+                json.dump(self.entries, f, separators=(",", ":"))
+            os.replace(temp_filename, self.filename)
+            self.dirty = False
+
+    @staticmethod
+    def key(path):
+        return str(pathlib.Path(path).absolute())
+
+    def lookup(self, path, stat, algorithm=HASH_ALGORITHM):
+        entry = self.entries.get(self.key(path))
+        if entry is not None and entry[:4] == [
+            stat.st_size,
+            stat.st_mtime_ns,
+            stat.st_ino,
+            algorithm,
+        ]:
+            return entry[4]
+        return None
+
+    def store(self, path, stat, digest, algorithm=HASH_ALGORITHM):
+        with self.lock:
+            self.entries[self.key(path)] = [
+                stat.st_size,
+                stat.st_mtime_ns,
+                stat.st_ino,
+                algorithm,
+                digest,
+            ]
+            self.dirty = True
+
+    def digest(self, path, algorithm=HASH_ALGORITHM, stat=None):
+        """Returns the digest of the file, hashing it only if it changed."""
+        stat = stat or os.stat(path)
+        digest = self.lookup(path, stat, algorithm)
+        if digest is None:
+            digest = hash_file(path, algorithm)
+            self.store(path, stat, digest, algorithm)
+        return digest
+
+
+def verify_install(install_folder, manifest, index=None, max_workers=None):
+    """
+    Verifies the client files in install_folder against a manifest.
+
+    Missing files and size mismatches are detected from a single stat call. All
+    remaining files are hashed in a thread pool unless the index already holds
+    a digest for their current (size, mtime_ns, inode).
+
+    Args:
+    install_folder (pathlib.Path): The WoW installation folder.
+    manifest (dict): A manifest as returned by load_manifest.
+    index (HashIndex): Optional persistent digest cache.
+    max_workers (int): Size of the hashing thread pool.
+
+    Returns:
+    dict: Maps the relative path of every damaged file to the reason,
+    one of "missing", "size" or "digest".
+    """
+    install_folder = pathlib.Path(install_folder)
+    algorithm = manifest.get("algorithm", HASH_ALGORITHM)
+    index = index if index is not None else HashIndex()
+
+    damaged = {}
+    to_hash = []
+    for file, expected in manifest["files"].items():
+        path = install_folder / file
+        try:
+            stat = path.stat()
+        except FileNotFoundError:
+            damaged[file] = "missing"
+            continue
+        if "size" in expected and stat.st_size != expected["size"]:
+            damaged[file] = "size"
+            continue
+        digest = index.lookup(path, stat, algorithm)
+        if digest is None:
+            to_hash.append((file, path, stat))
+        elif digest != expected["digest"]:
+            damaged[file] = "digest"
+
+    if to_hash:
+        logger.info(f"Hashing {len(to_hash)} changed files")
+        with ThreadPoolExecutor(max_workers=max_workers) as executor:
+            digests = executor.map(
+                lambda item: index.digest(item[1], algorithm, item[2]), to_hash
+            )
+            for (file, _, _), digest in zip(to_hash, digests):
+                if digest != manifest["files"][file]["digest"]:
+                    damaged[file] = "digest"
+        index.save()
+
+    for file, reason in damaged.items():
+        logger.info(f"Damaged file {file}: {reason}")
+    return damaged
+
+
+def is_excluded_client_file(file):
+    return file.lower() in EXCLUDED_CLIENT_FILES
+
+
+def client_members(infolist):
+    """
+    Maps the members of a client zip to their installed paths.
+
+    Returns:
+    dict: Maps the installed path of every verifiable member, relative to the
+    installation folder, to its zipfile.ZipInfo.
+    """
+    members = {}
+    for info in infolist:
+        if info.is_dir():
+            continue
+        parts = pathlib.PurePosixPath(info.filename).parts
+        if parts[0] == Config.CLIENT_ZIP_ROOT:
+            parts = parts[1:]
+        file = "/".join(parts)
+        if file and not is_excluded_client_file(file):
+            members[file] = info
+    return members
+
+
+def client_zip_members(zip_path):
+    """Reads the central directory of the local client zip."""
+    with zipfile.ZipFile(zip_path, "r") as zip_ref:
+        return client_members(zip_ref.infolist())
+
+
+def members_manifest(members):
+    """Builds a CRC32 manifest from the central directory entries of a zip."""
+    return {
+        "algorithm": "crc32",
+        "files": {
+            file: {"size": info.file_size, "digest": f"{info.CRC:08x}"}
+            for file, info in members.items()
+        },
+    }
+
+
+def client_zip_manifest(zip_path):
+    """Builds a CRC32 manifest from the central directory of the client zip."""
+    return members_manifest(client_zip_members(zip_path))
+
+
+def verify_against_zip(install_folder, zip_path, index=None, max_workers=None):
+    """
+    Verifies the installation against the CRC32 and size of each member of the
+    local client zip, without any server side manifest.
+
+    Returns:
+    dict: The damaged files as returned by verify_install.
+    """
+    logger.info(f"Verifying {install_folder} against {zip_path}")
+    manifest = client_zip_manifest(zip_path)
+    return verify_install(install_folder, manifest, index, max_workers)
+
+
+def extract_client_files(install_folder, zip_path, files):
+    """
+    Re-extracts single files from the local client zip into the installation.
+
+    Args:
+    install_folder (pathlib.Path): The WoW installation folder.
+    zip_path (pathlib.Path): The local client zip.
+    files (list): Paths relative to the installation folder.
+    """
+    install_folder = pathlib.Path(install_folder)
+    members = client_zip_members(zip_path)
+    with zipfile.ZipFile(zip_path, "r") as zip_ref:
+        for file in files:
+            dest_path = install_folder / file
+            temp_dest_path = pathlib.Path(f"{dest_path}.part")
+            temp_dest_path.parent.mkdir(parents=True, exist_ok=True)
+            logger.info(f"Extracting {file} from {zip_path}")
+            with zip_ref.open(members[file]) as source, open(
+                temp_dest_path, "wb"
+            ) as dest:
+                shutil.copyfileobj(source, dest, CRC32_BUFFER_SIZE)
+            os.replace(temp_dest_path, dest_path)